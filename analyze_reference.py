@@ -2,76 +2,45 @@
 Analyze the reference "The Legend" edit to extract exact cut timings
 """
 
-from moviepy import *
-import numpy as np
-import os
+from video_analysis import scan_video, detect_events, sensitivity_sweep, feature_at
 
 REFERENCE = "/Users/satyendra/Desktop/Atharv/Assets/＂The Legend🗿＂ - Steve Harrington 'Stranger Things 5 World premiere' Edit ｜ MONTAGEM NOCHE (Slowed) [1aJ2hJ48HU8].mp4"
 
-def detect_cuts(video_path, threshold=30):
-    """Detect scene cuts by analyzing frame differences"""
+def analyze(video_path, sensitivity=4.0, flash_threshold=200):
+    """Detect scene cuts and flashes in a single sequential pass over the video
+
+    sensitivity: how far above its local level a frame change must be to count as a cut
+    (features are cached, so re-running with another value doesn't decode again)
+    """
     print(f"Loading: {video_path}")
-    video = VideoFileClip(video_path)
-    
-    print(f"Duration: {video.duration:.2f}s")
-    print(f"FPS: {video.fps}")
-    print(f"Size: {video.size}")
+    print("\nAnalyzing frames for cuts and flashes...")
+    features = scan_video(video_path)
     
-    cuts = [0.0]  # Start
-    prev_frame = None
+    print(f"Duration: {features['duration']:.2f}s")
+    print(f"FPS: {features['fps']}")
+    print(f"Size: {features['size']}")
     
-    # Sample at higher rate for accuracy
-    sample_rate = 0.05  # Every 50ms
+    cut_events, flashes = detect_events(features, sensitivity=sensitivity,
+                                        flash_threshold=flash_threshold, min_gap=0.15)
     
-    print("\nAnalyzing frames for cuts...")
-    for t in np.arange(0, video.duration, sample_rate):
-        try:
-            frame = video.get_frame(t)
-            
-            if prev_frame is not None:
-                # Calculate difference
-                diff = np.mean(np.abs(frame.astype(float) - prev_frame.astype(float)))
-                
-                if diff > threshold:
-                    # Check if it's not too close to last cut
-                    if len(cuts) == 0 or (t - cuts[-1]) > 0.15:
-                        cuts.append(round(t, 2))
-                        print(f"  Cut detected at {t:.2f}s (diff: {diff:.1f})")
-            
-            prev_frame = frame.copy()
-        except:
-            continue
+    cuts = [0.0]  # Start
+    for cut in cut_events:
+        cuts.append(cut["time"])
+        print(f"  Cut detected at {cut['time']:.2f}s (diff: {cut['diff']:.1f})")
     
-    video.close()
+    sweep = ", ".join(f"{s}: {n}" for s, n in sensitivity_sweep(features).items())
+    print(f"\n  Cut frames by sensitivity -> {sweep}")
     
     print(f"\n=== DETECTED {len(cuts)} CUTS ===")
     for i, cut in enumerate(cuts):
         print(f"  {i+1}. {cut:.2f}s")
     
-    return cuts
-
-
-def analyze_brightness_curve(video_path):
-    """Analyze brightness over time to detect flashes"""
-    video = VideoFileClip(video_path)
-    
+    # Brightness curve comes from the same pass
     print("\n=== BRIGHTNESS ANALYSIS (detecting flashes) ===")
-    flashes = []
-    
-    for t in np.arange(0, video.duration, 0.033):  # ~30fps sampling
-        try:
-            frame = video.get_frame(t)
-            brightness = np.mean(frame)
-            
-            if brightness > 200:  # Very bright = flash
-                if len(flashes) == 0 or (t - flashes[-1]) > 0.1:
-                    flashes.append(round(t, 2))
-                    print(f"  Flash at {t:.2f}s (brightness: {brightness:.0f})")
-        except:
-            continue
+    for t in flashes:
+        print(f"  Flash at {t:.2f}s (brightness: {feature_at(features, 'brightness', t):.0f})")
     
-    video.close()
-    return flashes
+    return cuts, flashes
 
 
 if __name__ == "__main__":
@@ -79,8 +48,7 @@ if __name__ == "__main__":
     print("ANALYZING REFERENCE EDIT: The Legend - Steve Harrington")
     print("=" * 60)
     
-    cuts = detect_cuts(REFERENCE, threshold=25)
-    flashes = analyze_brightness_curve(REFERENCE)
+    cuts, flashes = analyze(REFERENCE, sensitivity=4.0)
     
     print("\n" + "=" * 60)
     print("SUMMARY")
@@ -0,0 +1,129 @@
+"""
+Beat-to-shot assembly
+Fills the slots of an edit (out_start, out_end, clip_type) with shots from a
+source's ranked shot index, instead of hand-picking a source timestamp for
+every slot:
+
+    shots = build_shot_index(SOURCE)
+    clips = assemble(EDIT_STRUCTURE, shots)          # [(src_start, speed), ...]
+    edit = edit_from_cuts(EDIT_STRUCTURE, clips, ...)
+
+Every slot gets its own shot (no footage is used twice) and a speed at which
+the slot's source range fits inside that shot. variant=1, 2, ... give
+alternative assemblies of the same structure for A/B tests.
+"""
+
+import numpy as np
+
+# Preferred playback speed per slot type
+SLOT_SPEEDS = {
+    "SLOW": 0.5,    # slow-mo hold
+    "NORMAL": 1.0,
+    "FAST": 1.0,    # rapid cuts
+}
+MIN_SPEED = 0.35     # slower than this stutters on 30fps sources
+SHOT_MARGIN = 0.05   # seconds kept clear of each shot's cuts
+SPEED_COST = 2.0     # score given up per octave a slot is slowed below its preferred speed
+VARIANT_NOISE = 1.0  # score jitter between variants
+
+# Slot types by length in beats (the target's held shots are its slow-mo ones)
+SLOW_BEATS = 2.0
+FAST_BEATS = 0.5
+DEFAULT_BEAT = 0.5   # seconds - when the audio has no usable beats
+
+
+# ============ SLOTS ============
+
+def beat_period(beats):
+    """Median seconds between beats"""
+    if len(beats) < 2:
+        return DEFAULT_BEAT
+    return float(np.median(np.diff(beats)))
+
+
+def beats_type(beats):
+    """SLOW / FAST / NORMAL from how many beats a slot lasts"""
+    return "SLOW" if beats >= SLOW_BEATS else "FAST" if beats <= FAST_BEATS else "NORMAL"
+
+
+def slot_type(duration, period):
+    """SLOW / FAST / NORMAL from a slot's measured duration"""
+    return beats_type(duration / period)
+
+
+def classify_slots(cuts, beats):
+    """(start, end, type) slots between consecutive cut times, typed by the beat period"""
+    period = beat_period(beats)
+    return [(start, end, slot_type(end - start, period)) for start, end in zip(cuts[:-1], cuts[1:])]
+
+
+def beat_slots(beats, pattern, end):
+    """Slots that start and end on beats, cycling pattern (beats per slot) up to end seconds"""
+    slots = []
+    i = 0
+    start = 0.0
+    period = beat_period(beats)
+    while start < end - 0.05:
+        step = pattern[len(slots) % len(pattern)]
+        i += step
+        stop = float(beats[i]) if i < len(beats) else start + step * period
+        stop = min(stop, end)
+        # Typed by the pattern's beat count - measured beats jitter around it
+        slots.append((start, stop, beats_type(step)))
+        start = stop
+    return slots
+
+
+# ============ SOLVER ============
+
+def fit_speeds(slots, shots):
+    """(slots, shots) speed matrix: the preferred speed, slowed down until the slot fits the shot"""
+    durations = np.array([end - start for start, end, _ in slots])
+    preferred = np.array([SLOT_SPEEDS.get(kind, 1.0) for _, _, kind in slots])
+    usable = np.array([shot["duration"] - 2 * SHOT_MARGIN for shot in shots])
+
+    speeds = np.minimum(preferred[:, None], usable[None, :] / durations[:, None])
+    speeds[speeds < MIN_SPEED] = np.nan  # shot too short for the slot
+    return speeds, preferred
+
+
+def assemble(slots, shots, variant=0):
+    """[(src_start, speed)] for every slot - best shot per slot, each shot used once"""
+    if len(shots) < len(slots):
+        raise ValueError(f"{len(slots)} slots but only {len(shots)} shots in the index")
+
+    speeds, preferred = fit_speeds(slots, shots)
+    scores = np.array([shot["score"] for shot in shots], dtype=np.float64)
+    if variant:
+        scores = scores + VARIANT_NOISE * np.random.RandomState(variant).gumbel(size=len(shots))
+
+    cost = -scores[None, :] + SPEED_COST * np.log2(preferred[:, None] / speeds)
+    cost[np.isnan(cost)] = np.inf
+
+    # Greedy: the slots needing the most source pick first, the rest fill in from what is left
+    need = np.array([(end - start) * preferred[i] for i, (start, end, _) in enumerate(slots)])
+    clips = [None] * len(slots)
+    used = np.zeros(len(shots), dtype=bool)
+    for i in np.argsort(-need, kind="stable"):
+        row = np.where(used, np.inf, cost[i])
+        j = int(np.argmin(row))
+        if np.isinf(row[j]):
+            # Nothing long enough is left: the longest free shot at the slowest speed
+            j = int(np.argmax(np.where(used, -1, [shot["duration"] for shot in shots])))
+            speed = MIN_SPEED
+        else:
+            speed = float(speeds[i, j])
+        used[j] = True
+
+        shot = shots[j]
+        duration = slots[i][1] - slots[i][0]
+        # Center the source range in the shot
+        src = shot["start"] + max(0.0, (shot["duration"] - duration * speed) / 2)
+        clips[i] = (round(src, 3), round(speed, 3))
+    return clips
+
+
+def print_assembly(slots, clips):
+    """Print one line per assembled slot"""
+    for i, ((start, end, kind), (src, speed)) in enumerate(zip(slots, clips)):
+        print(f"  Clip {i + 1:2d}: {start:5.2f}-{end:5.2f}s [{kind:6s}] <- src {src:7.2f}s @ {speed:.2f}x")
@@ -0,0 +1,198 @@
+"""
+Beat, onset and drop detection for the edit soundtracks
+Decodes a track once, computes onset strength from a vectorized STFT
+(spectral flux) and tracks beats with dynamic programming
+
+    beats = analyze_beats(AUDIO)["beats"]
+
+Results are cached per audio content hash in BEAT_STORE, so a track is only
+ever analyzed once.
+"""
+
+from moviepy import AudioFileClip
+from numpy.lib.stride_tricks import sliding_window_view
+import numpy as np
+import json
+import os
+
+from video_analysis import content_key
+
+SAMPLE_RATE = 22050
+N_FFT = 2048
+HOP = 512               # ~23 ms per onset frame
+TEMPO_RANGE = (60, 200)  # BPM
+TEMPO_PRIOR = 120        # BPM - ties between octaves go towards this
+TIGHTNESS = 100          # how strictly beats keep to the tempo
+DROP_RATIO = 2.0         # bass energy jump that counts as a drop
+DROP_GAP = 4.0           # seconds between drops
+
+BEAT_STORE = os.path.join(os.path.expanduser("~"), ".beat_cache")
+BEAT_VERSION = 1
+
+
+# ============ DECODING ============
+
+def load_audio(path, sr=SAMPLE_RATE):
+    """Mono float32 samples of an audio (or video) file"""
+    clip = AudioFileClip(path, fps=sr)
+    samples = clip.to_soundarray(fps=sr)
+    clip.close()
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples.astype(np.float32)
+
+
+# ============ SPECTRAL FEATURES ============
+
+def spectrogram(samples, n_fft=N_FFT, hop=HOP):
+    """Magnitude STFT (frames, bins) - all frames in one FFT call"""
+    padded = np.pad(samples, n_fft // 2)
+    frames = sliding_window_view(padded, n_fft)[::hop]
+    return np.abs(np.fft.rfft(frames * np.hanning(n_fft).astype(np.float32), axis=1))
+
+
+def onset_strength(spec):
+    """Spectral flux: summed rise of log magnitude per frame, normalized to peak 1"""
+    log_spec = np.log1p(100 * spec)
+    flux = np.zeros(len(spec), dtype=np.float32)
+    flux[1:] = np.maximum(0, np.diff(log_spec, axis=0)).sum(axis=1)
+    flux -= flux.mean()
+    np.maximum(flux, 0, out=flux)
+    return flux / (flux.max() or 1)
+
+
+def band_energy(spec, sr=SAMPLE_RATE, n_fft=N_FFT, max_hz=150):
+    """Per-frame energy below max_hz (kick and bass)"""
+    top = int(max_hz * n_fft / sr) + 1
+    return (spec[:, 1:top] ** 2).sum(axis=1)
+
+
+# ============ BEATS ============
+
+def estimate_tempo(onset, frame_rate):
+    """Beat period in onset frames, from the onset autocorrelation"""
+    n = len(onset)
+    spectrum = np.fft.rfft(onset, 2 * n)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum))[:n]
+
+    lags = np.arange(n)
+    min_lag = int(frame_rate * 60 / TEMPO_RANGE[1])
+    max_lag = min(n - 1, int(frame_rate * 60 / TEMPO_RANGE[0]))
+    bpm = 60 * frame_rate / np.maximum(lags, 1)
+    # Log-gaussian prior around TEMPO_PRIOR (one octave wide)
+    weight = np.exp(-0.5 * np.log2(bpm / TEMPO_PRIOR) ** 2)
+    score = autocorr * weight
+    return min_lag + int(np.argmax(score[min_lag:max_lag + 1]))
+
+
+def track_beats(onset, period, tightness=TIGHTNESS):
+    """Beat frames: the path through the onsets that best keeps to the period"""
+    n = len(onset)
+    # Predecessors are searched 0.5-2 periods back, penalized by how far off the period they are
+    offsets = np.arange(-2 * period, -(period // 2) + 1)
+    penalty = -tightness * np.log(-offsets / period) ** 2
+
+    score = onset.astype(np.float64).copy()
+    backlink = np.full(n, -1)
+    for t in range(n):
+        lo = t + offsets[0]
+        hi = t + offsets[-1]
+        if hi < 0:
+            continue
+        start = max(0, lo)
+        candidates = score[start:hi + 1] + penalty[start - lo:]
+        best = int(np.argmax(candidates))
+        score[t] = onset[t] + candidates[best]
+        backlink[t] = start + best
+
+    # End on the best-scoring frame in the last period and walk back
+    beat = n - period + int(np.argmax(score[n - period:])) if n > period else int(np.argmax(score))
+    beats = []
+    while beat >= 0:
+        beats.append(beat)
+        beat = backlink[beat]
+    return np.array(beats[::-1])
+
+
+def pick_onsets(onset, frame_rate, delta=0.1, min_gap=0.1):
+    """Frames where the onset strength peaks above its mean + delta"""
+    radius = 3
+    padded = np.pad(onset, radius, mode='edge')
+    local_max = sliding_window_view(padded, 2 * radius + 1).max(axis=1)
+    peaks = np.flatnonzero((onset == local_max) & (onset > onset.mean() + delta))
+
+    onsets = []
+    for i in peaks:
+        if not onsets or (i - onsets[-1]) / frame_rate > min_gap:
+            onsets.append(i)
+    return np.array(onsets, dtype=int)
+
+
+def find_drops(energy, beats, frame_rate, ratio=DROP_RATIO, gap=DROP_GAP):
+    """Beat frames where bass energy jumps: next second vs the two seconds before"""
+    cumulative = np.concatenate([[0.0], np.cumsum(energy)])
+    after, before = int(frame_rate), int(2 * frame_rate)
+    # A drop has to land in the loud part of the track, not just jump out of silence
+    floor = energy.mean()
+
+    candidates = []
+    for b in beats:
+        if b < before or b + after > len(energy):
+            continue
+        level_after = (cumulative[b + after] - cumulative[b]) / after
+        level_before = (cumulative[b] - cumulative[b - before]) / before
+        if level_after > floor and level_after > ratio * level_before:
+            candidates.append((level_after - level_before, b))
+
+    # Biggest rises first, nothing closer than gap to a bigger one
+    drops = []
+    for jump, b in sorted(candidates, reverse=True):
+        if all(abs(b - d) / frame_rate > gap for d in drops):
+            drops.append(b)
+    return np.array(sorted(drops), dtype=int)
+
+
+# ============ ANALYSIS ============
+
+def analyze_beats(path, store=BEAT_STORE):
+    """{"tempo", "beats", "onsets", "drops"} of an audio file - timestamps in seconds, cached"""
+    cache_path = None
+    if store:
+        cache_path = os.path.join(store, content_key(path) + ".json")
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get("version") == BEAT_VERSION:
+                return cached
+        except (OSError, ValueError):
+            pass
+
+    print(f"Analyzing beats: {os.path.basename(path)}")
+    samples = load_audio(path)
+    spec = spectrogram(samples)
+    frame_rate = SAMPLE_RATE / HOP
+
+    onset = onset_strength(spec)
+    period = estimate_tempo(onset, frame_rate)
+    beats = track_beats(onset, period)
+    onsets = pick_onsets(onset, frame_rate)
+    drops = find_drops(band_energy(spec), beats, frame_rate)
+
+    to_times = lambda frames: [round(float(f) / frame_rate, 3) for f in frames]
+    result = {
+        "version": BEAT_VERSION,
+        "tempo": round(60 * frame_rate / period, 1),
+        "beats": to_times(beats),
+        "onsets": to_times(onsets),
+        "drops": to_times(drops),
+    }
+    print(f"  {result['tempo']} BPM, {len(beats)} beats, {len(onsets)} onsets, {len(drops)} drops")
+
+    if cache_path:
+        try:
+            os.makedirs(store, exist_ok=True)
+            with open(cache_path, 'w') as f:
+                json.dump(result, f)
+        except OSError:
+            print(f"  Warning: could not cache beats at {cache_path}")
+    return result
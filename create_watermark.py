@@ -1,79 +1,89 @@
-from PIL import Image, ImageDraw, ImageFont
-from moviepy import VideoClip
 import numpy as np
 import os
 
+import text_cache
+from timeline import Timeline
+from watermark_output import render_watermark
+
 # Settings
 WIDTH, HEIGHT = 648, 584
 FPS = 30
 DURATION = 5.0
 TEXT = "z_editz"
+FONT_SIZE = 80
 BAR_WIDTH = 6
+OUTPUT = 'editz/output/z_editz_watermark.mp4'  # .mov or .npz keep the alpha (see watermark_output)
+
+
+def load_font(size=FONT_SIZE, font=None):
+    """Avenir Next Condensed Italic for that futuristic look, or the default font (loaded once per process)
+
+    font: font file (path or [path, index]) to try first
+    """
+    preferred = (tuple(font) if isinstance(font, list) else font,) if font else ()
+    return text_cache.load_font(size, *preferred, text_cache.AVENIR_CONDENSED)
+
+
+def make_layout(text, size, font):
+    """Text metrics, positions and the animation timeline of one watermark variant"""
+    width, height = size
+    left, top, right, bottom = font.getbbox(text)
+    text_width, text_height = right - left, bottom - top
+
+    center_x, center_y = width // 2, height // 2
+    return {
+        "size": (width, height),
+        "text": text,
+        "font": font,
+        "text_x": center_x - text_width // 2 - 20,
+        "text_y": center_y - text_height // 2,
+        "bar_x": center_x + text_width // 2 + 15,
+        "bar_top": center_y - text_height // 2 - 10,
+        "bar_bottom": center_y + text_height // 2 + 10,
+        "timeline": make_timeline(),
+    }
+
+
+def make_timeline():
+    """Keyframe tracks of the whole animation (text_alpha, bar_alpha, text_offset_x)"""
+    # 0 - 1s fade in, 1 - 3s hold, 3 - 4s text slides left and fades, 4 - 5s bar fades
+    timeline = Timeline()
+    timeline.add("text_alpha", [(0.0, 0), (1.0, 255), (3.0, 255), (4.0, 0)], integer=True)
+    timeline.add("bar_alpha", [(0.0, 0), (1.0, 255), (4.0, 255), (5.0, 0)], integer=True)
+    timeline.add("text_offset_x", [(3.0, 0), (4.0, -150), (4.0, 0)], integer=True)
+    return timeline
+
+
+def render_frame(state, out, layout):
+    """Draw one frame's animation state into out (height, width, 3) - the cached text run plus the bar"""
+    text_alpha, bar_alpha = int(state["text_alpha"]), int(state["bar_alpha"])
+    text_offset_x = int(state["text_offset_x"])
+    out[:] = 0
 
-# Create output directory
-os.makedirs('editz/output', exist_ok=True)
-
-# Load font - Avenir Next Condensed Italic for that futuristic look
-try:
-    font = ImageFont.truetype("/System/Library/Fonts/Avenir Next Condensed.ttc", 80)
-except:
-    font = ImageFont.load_default()
-    print("Warning: Using default font")
-
-def make_frame(t):
-    img = Image.new('RGB', (WIDTH, HEIGHT), (0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    bbox = draw.textbbox((0, 0), TEXT, font=font)
-    text_width = bbox[2] - bbox[0]
-    text_height = bbox[3] - bbox[1]
-    
-    center_x = WIDTH // 2
-    center_y = HEIGHT // 2
-    
-    # Animation phases
-    text_alpha = 255
-    bar_alpha = 255
-    text_offset_x = 0
-    
-    if t < 1.0:
-        text_alpha = int(255 * (t / 1.0))
-        bar_alpha = text_alpha
-    elif t < 3.0:
-        text_alpha = 255
-        bar_alpha = 255
-    elif t < 4.0:
-        progress = (t - 3.0) / 1.0
-        text_offset_x = -int(progress * 150)
-        text_alpha = int(255 * (1 - progress))
-        bar_alpha = 255
-    else:
-        text_alpha = 0
-        progress = (t - 4.0) / 1.0
-        bar_alpha = int(255 * (1 - progress))
-    
-    text_x = center_x - text_width // 2 - 20 + text_offset_x
-    text_y = center_y - text_height // 2
-    
     if text_alpha > 0:
-        txt_img = Image.new('RGBA', (WIDTH, HEIGHT), (0, 0, 0, 0))
-        txt_draw = ImageDraw.Draw(txt_img)
-        txt_draw.text((text_x, text_y), TEXT, font=font, fill=(255, 255, 255, text_alpha))
-        img = Image.alpha_composite(img.convert('RGBA'), txt_img).convert('RGB')
-        draw = ImageDraw.Draw(img)
-    
-    bar_x = center_x + text_width // 2 + 15
-    bar_top = center_y - text_height // 2 - 10
-    bar_bottom = center_y + text_height // 2 + 10
-    
+        # White text over black: the composite's brightness is the text layer's alpha,
+        # i.e. the opaque run's coverage scaled by text_alpha (rounded the way PIL does)
+        run = text_cache.text_run(layout["text"], layout["font"])
+        box = text_cache.run_slices(out.shape, run, layout["text_x"] + text_offset_x, layout["text_y"])
+        if box is not None:
+            rows, cols, run_rows, run_cols = box
+            coverage = run[0][run_rows, run_cols, 3:4].astype(np.uint16)
+            coverage *= np.uint16(text_alpha)
+            coverage += np.uint16(127)
+            np.floor_divide(coverage, 255, out=coverage)
+            out[rows, cols] = coverage
+
     if bar_alpha > 0:
-        bar_color = (bar_alpha, bar_alpha, bar_alpha)
-        draw.rectangle([bar_x, bar_top, bar_x + BAR_WIDTH, bar_bottom], fill=bar_color)
-    
-    return np.array(img)
-
-print("Creating watermark video...")
-clip = VideoClip(make_frame, duration=DURATION)
-clip = clip.with_fps(FPS)
-clip.write_videofile('editz/output/z_editz_watermark.mp4', codec='libx264', fps=FPS)
-print("Done! Saved to editz/output/z_editz_watermark.mp4")
+        bar_x = layout["bar_x"]
+        out[layout["bar_top"]:layout["bar_bottom"] + 1, bar_x:bar_x + BAR_WIDTH + 1] = bar_alpha
+
+    return out
+
+
+if __name__ == "__main__":
+    os.makedirs(os.path.dirname(OUTPUT), exist_ok=True)
+    layout = make_layout(TEXT, (WIDTH, HEIGHT), load_font())
+
+    print("Creating watermark video...")
+    render_watermark(render_frame, DURATION, layout, OUTPUT, FPS)
+    print(f"Done! Saved to {OUTPUT}")
@@ -0,0 +1,757 @@
+"""
+Shared edit engine for the Steve Harrington edits
+Plans a whole CUTS/SOURCE_CLIPS timeline once and renders it through one frame path
+
+An edit is a list of dicts, one per output segment:
+
+    {"src": 15, "duration": 0.55, "speed": 1.0, "grade": apply_color_grade,
+     "flash": (0.05, 0.85)}
+
+- src:      start time in the source video (seconds)
+- duration: length of the segment in the final edit (seconds)
+- speed:    source seconds per output second (0.5 = half-speed slow-mo, 0 = freeze)
+- delay:    output seconds before the source starts playing (hidden by the flash)
+- grade:    frame -> frame color grade function
+- vignette: (intensity, power, floor)
+- zoom:     (zoom_start, zoom_end) - magnification over the segment
+- shake:    camera shake intensity in pixels
+- flash:    (duration, intensity) or (duration, intensity, color) at segment start
+
+Flashes anywhere on the timeline (not tied to a cut) are passed to render_edit
+as flashes=[(time, duration, intensity), ...] or (time, duration, intensity, color).
+"""
+
+from moviepy import *
+from moviepy.config import FFMPEG_BINARY
+import numpy as np
+from PIL import Image
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import bisect
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+from frame_source import FRAME_CACHE, FRAME_CACHE_BYTES, SourceReader
+from frame_writer import FrameWriter
+
+
+# ============ EDIT LISTS ============
+
+def edit_from_cuts(cuts, source_clips, flash_indices=(), flash=(0.05, 0.85), **effects):
+    """Build an edit list from CUTS (out_start, out_end, ...) and SOURCE_CLIPS (src_start, speed)"""
+    edit = []
+    for i, (cut, (src_start, speed)) in enumerate(zip(cuts, source_clips)):
+        entry = dict(effects, src=src_start, duration=cut[1] - cut[0], speed=speed)
+        if i in flash_indices:
+            entry["flash"] = flash
+        edit.append(entry)
+    return edit
+
+
+def snap_to_beats(edit, beats, tolerance=0.25):
+    """Move every cut to the nearest beat within tolerance seconds (source ranges follow the durations)"""
+    snapped = []
+    planned = cut = 0.0
+    for entry in edit:
+        planned += entry["duration"]
+        i = bisect.bisect_left(beats, planned)
+        near = min(beats[max(0, i - 1):i + 1], key=lambda b: abs(b - planned), default=planned)
+        # Never swallow a segment (or its flash delay)
+        if abs(near - planned) > tolerance or near - cut <= entry.get("delay", 0.0) + 0.05:
+            near = planned
+        snapped.append(dict(entry, duration=near - cut))
+        cut = near
+    return snapped
+
+
+def plan_timeline(edit, source_duration, fps=60):
+    """Lay the edit out on the output frame grid and clamp every source range"""
+    plan = []
+    out_time = 0.0
+    start_frame = 0
+
+    for i, entry in enumerate(edit):
+        out_time += entry["duration"]
+        end_frame = int(round(out_time * fps))
+        if end_frame <= start_frame:
+            continue
+
+        speed = entry.get("speed", 1.0)
+        delay = entry.get("delay", 0.0)
+        src_start = entry["src"]
+
+        # Slow-mo needs less source than output: duration * speed
+        src_duration = max(0.0, entry["duration"] - delay) * speed
+        if src_start + src_duration > source_duration:
+            src_start = max(0, source_duration - src_duration - 0.5)
+
+        segment = dict(entry)
+        segment.update(
+            index=i,
+            src=src_start,
+            src_duration=src_duration,
+            speed=speed,
+            delay=delay,
+            start_frame=start_frame,
+            end_frame=end_frame,
+            out_start=start_frame / fps,
+            out_end=end_frame / fps,
+        )
+        plan.append(segment)
+        start_frame = end_frame
+
+    return plan
+
+
+def print_plan(plan):
+    """Print one line per planned segment"""
+    for seg in plan:
+        print(f"      Clip {seg['index'] + 1:2d}: {seg['out_start']:5.2f}-{seg['out_end']:5.2f}s "
+              f"(src: {seg['src']:.2f}s for {seg['src_duration']:.2f}s, speed: {seg['speed']}x)")
+
+
+# ============ COLOR LUTS ============
+# Grades are per-pixel functions, so each one is evaluated once over every
+# possible input color and applied per frame as a uint8 table lookup
+
+LUT_CACHE = {}
+
+
+def compile_grade(grade):
+    """Compile a per-pixel grade into a (3, 256) or (3, 256**3) uint8 lookup table"""
+    lut = LUT_CACHE.get(grade)
+    if lut is not None:
+        return lut
+
+    # Separable grades (each channel only looks at itself) need one ramp per channel
+    ramp = np.arange(256, dtype=np.uint8)
+    lut = np.ascontiguousarray(grade(np.stack([ramp] * 3, axis=1)[None])[0].T)
+
+    probe = np.random.RandomState(0).randint(0, 256, (64, 64, 3), dtype=np.uint8)
+    if not np.array_equal(apply_lut(probe, lut), grade(probe)):
+        # Channels interact (e.g. shadow masks) - tabulate every RGB triple,
+        # one red plane at a time to keep the temporaries small
+        lut = np.empty((3, 256 ** 3), dtype=np.uint8)
+        plane = np.empty((256, 256, 3), dtype=np.uint8)
+        plane[:, :, 1], plane[:, :, 2] = np.indices((256, 256), dtype=np.uint8)
+        for r in range(256):
+            plane[:, :, 0] = r
+            lut[:, r << 16:(r + 1) << 16] = grade(plane).reshape(-1, 3).T
+
+    LUT_CACHE[grade] = lut
+    return lut
+
+
+def apply_lut(frame, lut, out=None):
+    """Grade a uint8 RGB frame through a compiled lookup table"""
+    if out is None:
+        out = np.empty(frame.shape, dtype=np.uint8)
+
+    if lut.shape[1] == 256:
+        idx = None
+    else:
+        # Packed 24-bit RGB index into the 3D table
+        idx = work_buffer("lut_index", frame.shape[:2], np.uint32)
+        tmp = work_buffer("lut_shift", frame.shape[:2], np.uint32)
+        np.left_shift(frame[:, :, 0], 16, out=idx, dtype=np.uint32)
+        np.left_shift(frame[:, :, 1], 8, out=tmp, dtype=np.uint32)
+        idx |= tmp
+        idx |= frame[:, :, 2]
+
+    for c in range(3):
+        np.take(lut[c], frame[:, :, c] if idx is None else idx, out=out[:, :, c], mode='clip')
+    return out
+
+
+# ============ VIGNETTE ============
+# The vignette only depends on the frame size and its parameters, so the mask
+# is built once and stored as an (h, w, 3) uint16 multiplier where 256 means 1.0
+
+VIGNETTE_CACHE = {}
+
+
+def vignette_mask(size, intensity=0.4, power=2, floor=0.4):
+    """Cached (h, w, 3) vignette multiplier for a frame size, fixed point with 256 = 1.0"""
+    key = (tuple(size), intensity, power, floor)
+    mask = VIGNETTE_CACHE.get(key)
+    if mask is not None:
+        return mask
+
+    w, h = size
+    Y, X = np.ogrid[:h, :w]
+    center_y, center_x = h / 2, w / 2
+    dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
+    max_dist = np.sqrt(center_x**2 + center_y**2)
+    vignette = np.clip(1 - (dist / max_dist) ** power * intensity, floor, 1)
+
+    mask = np.round(vignette * 256).astype(np.uint16)
+    mask = np.ascontiguousarray(np.repeat(mask[:, :, None], 3, axis=2))
+    VIGNETTE_CACHE[key] = mask
+    return mask
+
+
+def scale_frame(frame, mask, work=None):
+    """frame = frame * mask / 256, in place, through a uint16 work buffer"""
+    if work is None:
+        work = np.empty(frame.shape, dtype=np.uint16)
+    np.multiply(frame, mask, out=work)
+    np.right_shift(work, 8, out=frame, casting='unsafe')
+    return frame
+
+
+# ============ FRAME EFFECTS ============
+
+def crop_box(src_size, out_size):
+    """Centered crop box (x1, y1, x2, y2) matching the output aspect ratio"""
+    w, h = src_size
+    target_ratio = out_size[0] / out_size[1]
+
+    if w / h > target_ratio:
+        # Too wide - crop sides
+        new_w = int(h * target_ratio)
+        x1 = (w - new_w) // 2
+        return (x1, 0, x1 + new_w, h)
+    else:
+        # Too tall - crop top/bottom
+        new_h = int(w / target_ratio)
+        y1 = (h - new_h) // 2
+        return (0, y1, w, y1 + new_h)
+
+
+def zoom_box(crop, zoom):
+    """Source box that shows the crop magnified by zoom around its center"""
+    x1, y1, x2, y2 = crop
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    half_w, half_h = (x2 - x1) / (2 * zoom), (y2 - y1) / (2 * zoom)
+    return (cx - half_w, cy - half_h, cx + half_w, cy + half_h)
+
+
+# Resampling filters: bilinear for previews, Lanczos for finals
+RESAMPLE = {"bilinear": Image.BILINEAR, "lanczos": Image.LANCZOS}
+
+
+def resample_box(frame, box, size, quality="lanczos", out=None):
+    """Crop a (float) source box and scale it to size in a single resample
+
+    out: (h, w, 3) buffer to fill and return instead of a new array. Pillow still
+    resizes into an image of its own, so this saves the caller's copy, not the resample.
+    """
+    h, w = frame.shape[:2]
+    x1, y1, x2, y2 = box
+
+    # Hand PIL only the pixels the filter can reach (plus a few for Lanczos support)
+    ix1, iy1 = max(0, int(x1) - 3), max(0, int(y1) - 3)
+    ix2, iy2 = min(w, int(np.ceil(x2)) + 3), min(h, int(np.ceil(y2)) + 3)
+    img = Image.fromarray(np.ascontiguousarray(frame[iy1:iy2, ix1:ix2]))
+    img = img.resize(tuple(size), RESAMPLE[quality], box=(x1 - ix1, y1 - iy1, x2 - ix1, y2 - iy1))
+    if out is None:
+        return np.asarray(img)
+    np.copyto(out, img)
+    return out
+
+
+def placement(out_shape, frame_shape, x, y):
+    """Clipped (target, source) slices for drawing a frame at (x, y) on the output"""
+    out_h, out_w = out_shape[:2]
+    h, w = frame_shape[:2]
+    tx1, ty1 = max(0, x), max(0, y)
+    tx2, ty2 = min(out_w, x + w), min(out_h, y + h)
+    target = (slice(ty1, ty2), slice(tx1, tx2))
+    source = (slice(ty1 - y, ty2 - y), slice(tx1 - x, tx2 - x))
+    return target, source
+
+
+def shake_offset(intensity, t):
+    """Pseudo-random (dx, dy) camera shake seeded from the clip time"""
+    rng = np.random.RandomState(int(t * 1000) % 10000)
+    dx = int(rng.uniform(-intensity, intensity))
+    dy = int(rng.uniform(-intensity, intensity))
+    return dx, dy
+
+
+def flash_color(intensity, color="white"):
+    """RGB color of a flash"""
+    if color == "blue":
+        return (int(100 * intensity), int(150 * intensity), int(255 * intensity))
+    return tuple([int(255 * intensity)] * 3)
+
+
+# ============ OVERLAYS ============
+# An RGBA overlay (e.g. a watermark) is trimmed to the box its visible pixels
+# cover and premultiplied once, so each frame only blends that box
+
+def compile_overlay(overlay):
+    """(rows, cols, rgb * alpha, 255 - alpha) of an RGBA overlay's visible box, or None if it is empty"""
+    alpha = overlay[:, :, 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    cols = np.flatnonzero(alpha.any(axis=0))
+    if not len(rows):
+        return None
+    rows, cols = slice(int(rows[0]), int(rows[-1]) + 1), slice(int(cols[0]), int(cols[-1]) + 1)
+    box = overlay[rows, cols]
+    alpha = box[:, :, 3:4].astype(np.uint16)
+    return rows, cols, box[:, :, :3] * alpha, 255 - alpha
+
+
+def composite_overlay(frame, overlay):
+    """Alpha-blend a compiled overlay onto its box of the frame, in place"""
+    rows, cols, premultiplied, inverse = overlay
+    target = frame[rows, cols]
+    work = work_buffer("overlay", premultiplied.shape, np.uint16)
+    np.multiply(target, inverse, out=work)
+    work += premultiplied
+    np.floor_divide(work, 255, out=target, casting='unsafe')
+    return frame
+
+
+def print_overlay(overlay, size):
+    """One progress line: how much of the frame the overlay blends"""
+    rows, cols = overlay[:2]
+    box = (rows.stop - rows.start) * (cols.stop - cols.start)
+    print(f"      Overlay: {cols.stop - cols.start}x{rows.stop - rows.start} box "
+          f"({100 * box / (size[0] * size[1]):.1f}% of the frame)")
+
+
+# ============ FLASHES ============
+# Flashes are timeline events, resolved per output frame before rendering.
+# A segment's own flash covers its first frames (the source never decodes
+# under it); timeline flashes blend over whatever is there. Frames without a
+# flash pay one dict lookup.
+
+def flash_events(plan, flashes, fps):
+    """{frame: [(alpha, rgb), ...]} for every output frame a flash touches"""
+    events = {}
+
+    def add(start, duration, alpha, rgb):
+        first = int(np.ceil(start * fps - 1e-6))
+        for n in range(first, int(np.ceil((start + duration) * fps - 1e-6))):
+            events.setdefault(n, []).append((alpha, rgb))
+
+    for seg in plan:
+        if seg.get("flash"):
+            add(seg["out_start"], seg["flash"][0], 1.0, flash_color(*seg["flash"][1:]))
+    for flash in flashes or ():
+        time, duration, intensity = flash[:3]
+        add(time, duration, intensity, flash_color(1.0, *flash[3:]))
+    return events
+
+
+def blend_flash(frame, alpha, rgb):
+    """Blend a flash color over the frame in place (alpha 0-1)"""
+    a = int(round(alpha * 256))
+    if a >= 256:
+        frame[:] = rgb
+        return frame
+    work = work_buffer("flash", frame.shape, np.uint16)
+    np.multiply(frame, np.uint16(256 - a), out=work)
+    work += np.array(rgb, dtype=np.uint16) * np.uint16(a)
+    np.right_shift(work, 8, out=work)
+    np.copyto(frame, work, casting='unsafe')
+    return frame
+
+
+# ============ EFFECT KERNELS ============
+# Each planned segment is compiled once into a kernel(local_t, out) that pulls
+# its source frame and writes grade, vignette and shake straight into the
+# render's output buffer. Scratch space is shared between kernels.
+
+WORK_BUFFERS = {}
+
+
+def work_buffer(name, shape, dtype):
+    """Reusable scratch array for one frame size"""
+    key = (name, tuple(shape), dtype)
+    buf = WORK_BUFFERS.get(key)
+    if buf is None:
+        buf = WORK_BUFFERS[key] = np.empty(shape, dtype=dtype)
+    return buf
+
+
+def compile_segment(seg, source, size=None, quality="lanczos"):
+    """Collapse a segment's effect chain into one kernel(local_t, out) -> out"""
+    src_w, src_h = source.size
+    out_w, out_h = size or source.size
+    last_t = source.duration - 1.0 / source.fps
+    seg_duration = max(seg["out_end"] - seg["out_start"], 0.01)
+
+    # Crop + scale + zoom collapse into one source box per frame
+    crop = crop_box((src_w, src_h), (out_w, out_h)) if size else (0, 0, src_w, src_h)
+    rescale = (out_w, out_h) != (src_w, src_h)
+
+    lut = compile_grade(seg["grade"]) if seg.get("grade") else None
+    mask = vignette_mask((out_w, out_h), *seg["vignette"]) if seg.get("vignette") else None
+    zoom = seg.get("zoom")
+    shake = seg.get("shake", 0)
+
+    def place_frame(frame, z, local_t, out):
+        """Resample (if needed), position and grade a source frame into out"""
+        if z >= 1.0:
+            if rescale or z != 1.0:
+                frame = resample_box(frame, zoom_box(crop, z), (out_w, out_h), quality)
+        else:
+            # Zooming out shrinks the whole crop onto black
+            frame = resample_box(frame, crop, (int(out_w * z), int(out_h * z)), quality)
+
+        # Place the frame (centered, shaken); anything it leaves uncovered is black
+        x, y = (out_w - frame.shape[1]) // 2, (out_h - frame.shape[0]) // 2
+        if shake:
+            dx, dy = shake_offset(shake, local_t)
+            x, y = x - dx, y - dy
+        target, source_area = placement(out.shape, frame.shape, x, y)
+        if (x, y, frame.shape[1], frame.shape[0]) != (0, 0, out_w, out_h):
+            out[:] = 0
+        target, frame = out[target], frame[source_area]
+
+        if lut is not None:
+            apply_lut(frame, lut, out=target)
+        else:
+            np.copyto(target, frame)
+
+    def kernel(local_t, out):
+        src_t = seg["src"] + max(0.0, local_t - seg["delay"]) * seg["speed"]
+        frame = source.get_frame(min(src_t, last_t))
+
+        z = zoom[0] + (zoom[1] - zoom[0]) * local_t / seg_duration if zoom else 1.0
+        if z >= 1.0 and (rescale or z != 1.0) and lut is None and not shake:
+            # The resample covers the whole frame as is - write it straight into the output
+            resample_box(frame, zoom_box(crop, z), (out_w, out_h), quality, out=out)
+        else:
+            place_frame(frame, z, local_t, out)
+
+        if mask is not None:
+            scale_frame(out, mask, work_buffer("vignette", out.shape, np.uint16))
+        return out
+
+    return kernel
+
+
+# ============ RENDERING ============
+
+def render_frames(kernels, plan, writer, start_frame, end_frame, fps, overlay=None, flashes=None):
+    """Render output frames [start_frame, end_frame) straight into the writer's ring buffers
+
+    overlay: compile_overlay() of an RGBA overlay
+    flashes: flash_events() of the timeline
+    """
+    starts = [seg["start_frame"] for seg in plan]
+    flashes = flashes or {}
+    for n in range(start_frame, end_frame):
+        i = max(0, bisect.bisect_right(starts, n) - 1)
+        out = writer.next_buffer()
+        events = flashes.get(n, ())
+        # Skip the source entirely under an opaque flash
+        covered = max((k for k, (alpha, _) in enumerate(events) if alpha >= 1.0), default=-1)
+        if covered < 0:
+            kernels[i](n / fps - plan[i]["out_start"], out)
+        for alpha, rgb in events[max(covered, 0):]:
+            blend_flash(out, alpha, rgb)
+        if overlay is not None:
+            composite_overlay(out, overlay)
+        writer.submit(out)
+
+
+# ============ PARALLEL RENDERING ============
+# Segments are independent once planned, so each one can be rendered by its
+# own worker process to an intermediate file. Every intermediate uses the same
+# encoder settings, so ffmpeg's concat demuxer joins them with a stream copy.
+
+SEGMENT_CHUNK = 2.0  # seconds - longer segments are split into several jobs
+
+
+def split_jobs(plan, end_frame, fps):
+    """Independent (segment index, start_frame, end_frame) jobs covering the timeline"""
+    chunk = max(1, int(round(SEGMENT_CHUNK * fps)))
+    jobs = []
+    for i, seg in enumerate(plan):
+        start, end = seg["start_frame"], min(seg["end_frame"], end_frame)
+        for frame in range(start, end, chunk):
+            jobs.append((i, frame, min(frame + chunk, end)))
+    return jobs
+
+
+def job_source_time(seg, start_frame, fps):
+    """Source time of a job's first frame"""
+    local_t = start_frame / fps - seg["out_start"]
+    return seg["src"] + max(0.0, local_t - seg["delay"]) * seg["speed"]
+
+
+def source_order(jobs, plan, fps):
+    """Jobs sorted by where they read the source, so each worker's reader mostly moves forward"""
+    return sorted(jobs, key=lambda job: (job_source_time(plan[job[0]], job[1], fps), job[1]))
+
+
+# One reader per source (and decode resolution) per worker process, kept open between jobs
+WORKER_SOURCES = {}
+
+
+def open_source(source_path, resolution=None):
+    """This process's shared reader for a source"""
+    key = (source_path, resolution)
+    source = WORKER_SOURCES.get(key)
+    if source is None:
+        source = WORKER_SOURCES[key] = SourceReader(source_path, target_resolution=resolution)
+    return source
+
+
+def init_worker(cache_bytes):
+    """Worker setup: this process's share of the frame cache budget"""
+    FRAME_CACHE.resize(cache_bytes)
+
+
+def render_job(source_path, seg, start_frame, end_frame, path, fps, size=None, overlay=None,
+               quality="lanczos", bitrate=None, preset='medium', threads=None, resolution=None,
+               flashes=None):
+    """Worker: render output frames [start_frame, end_frame) of one segment to a video file"""
+    source = open_source(source_path, resolution)
+    kernel = compile_segment(seg, source, size, quality)
+
+    with FrameWriter(path, size or source.size, fps, preset=preset, bitrate=bitrate,
+                     threads=threads) as writer:
+        render_frames([kernel], [seg], writer, start_frame, end_frame, fps, overlay, flashes)
+
+    return path
+
+
+def concat_segments(paths, output, audio=None, duration=None):
+    """Stream-copy rendered segments into the output and mux the audio once"""
+    list_path = output + ".segments.txt"
+    with open(list_path, 'w') as f:
+        for path in paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    cmd = [FFMPEG_BINARY, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path]
+    if audio:
+        cmd += ["-i", audio, "-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac"]
+    cmd += ["-c:v", "copy"]
+    if duration:
+        cmd += ["-t", "%.3f" % duration]
+    cmd += ["-movflags", "+faststart", output]
+
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        os.remove(list_path)
+
+
+# ============ SEGMENT CACHE ============
+# A rendered segment is named after a hash of everything that decides its
+# pixels, so re-rendering an edit only encodes the segments that changed
+
+# Bump whenever a kernel (grade, vignette, resample, flash, overlay) renders different pixels,
+# so segments rendered by older code are never reused
+CACHE_VERSION = 1
+
+SEGMENT_KEY_FIELDS = ("src", "src_duration", "speed", "delay", "vignette", "zoom", "shake")
+GRADE_DIGESTS = {}
+
+
+def grade_digest(grade):
+    """Hash of a grade's compiled lookup table (stable across runs, unlike the function)"""
+    digest = GRADE_DIGESTS.get(grade)
+    if digest is None:
+        digest = GRADE_DIGESTS[grade] = hashlib.sha1(compile_grade(grade)).hexdigest()
+    return digest
+
+
+def render_settings(source_path, fps, size, overlay, quality, bitrate, preset, resolution):
+    """Everything outside the segments that changes the rendered pixels"""
+    stat = os.stat(source_path)
+    overlay_digest = None
+    if overlay is not None:
+        rows, cols, premultiplied, inverse = overlay
+        overlay_digest = (rows.start, cols.start, hashlib.sha1(premultiplied).hexdigest(),
+                          hashlib.sha1(inverse).hexdigest())
+    return (CACHE_VERSION, os.path.abspath(source_path), stat.st_size, stat.st_mtime, fps,
+            tuple(size) if size else None, overlay_digest, quality, bitrate, preset, resolution)
+
+
+def job_flashes(flashes, job):
+    """The flash events that land on one job's frames"""
+    _, start, end = job
+    return {n: events for n, events in flashes.items() if start <= n < end}
+
+
+def segment_key(seg, job, settings, flashes=None):
+    """Content hash of one segment job (flashes: its job_flashes)"""
+    _, start, end = job
+    effects = tuple((name, seg.get(name)) for name in SEGMENT_KEY_FIELDS)
+    grade = grade_digest(seg["grade"]) if seg.get("grade") else None
+    # Frames relative to the segment, so moving a segment along the timeline keeps its key
+    frames = (start - seg["start_frame"], end - seg["start_frame"], seg["end_frame"] - seg["start_frame"])
+    flashes = sorted((n - seg["start_frame"], events) for n, events in (flashes or {}).items())
+    return hashlib.sha1(repr((settings, effects, grade, frames, flashes)).encode()).hexdigest()
+
+
+def render_parallel(source_path, plan, output, end_frame, fps, audio=None, size=None,
+                    overlay=None, quality="lanczos", bitrate=None, preset='medium', workers=None,
+                    resolution=None, cache_dir=None, flashes=None):
+    """Render the planned timeline segment by segment across worker processes
+
+    overlay:   compile_overlay() of an RGBA overlay
+    cache_dir: keep rendered segments there and only render the ones it doesn't have
+    flashes:   flash_events() of the timeline
+    """
+    workers = workers or os.cpu_count()
+    jobs = split_jobs(plan, end_frame, fps)
+    flashes = {job: job_flashes(flashes or {}, job) for job in jobs}
+    # Split the cores between the workers' x264 encoders
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with tempfile.TemporaryDirectory(prefix="segments_", dir=os.path.dirname(os.path.abspath(output))) as tmp:
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            settings = render_settings(source_path, fps, size, overlay, quality, bitrate, preset, resolution)
+            paths = {job: os.path.join(cache_dir, segment_key(plan[job[0]], job, settings, flashes[job]) + ".mp4")
+                     for job in jobs}
+        else:
+            paths = {job: os.path.join(tmp, "%05d_%06d.mp4" % job[:2]) for job in jobs}
+
+        # Paths follow the timeline; extraction follows the source.
+        # Identical segments share a path and are rendered once.
+        todo, pending = [], set()
+        for job in source_order(jobs, plan, fps):
+            if paths[job] not in pending and not os.path.exists(paths[job]):
+                pending.add(paths[job])
+                todo.append(job)
+        if cache_dir:
+            print(f"      {len(jobs) - len(todo)}/{len(jobs)} segments unchanged, reused from {cache_dir}")
+        print(f"      {len(todo)} segment jobs on {workers} workers")
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(FRAME_CACHE_BYTES // workers,)) as pool:
+            # Render into the temp dir and move into the cache once complete,
+            # so an interrupted render never leaves a broken segment behind
+            futures = {
+                pool.submit(render_job, source_path, plan[job[0]], job[1], job[2],
+                            os.path.join(tmp, "%05d_%06d.mp4" % job[:2]), fps, size,
+                            overlay, quality, bitrate, preset, threads, resolution, flashes[job]): job
+                for job in todo
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                path, job = future.result(), futures[future]
+                if path != paths[job]:
+                    shutil.move(path, paths[job])
+                print(f"      Rendered {done}/{len(todo)} segments", end="\r")
+        print()
+
+        print("      Concatenating segments and muxing audio...")
+        concat_segments([paths[job] for job in jobs], output, audio, end_frame / fps)
+
+
+# ============ PROXY RENDERS ============
+# A proxy renders the same edit list from a 1/4 resolution decode at a low
+# frame rate with the fastest encoder settings, for checking timing quickly
+
+PROXY_SCALE = 0.25
+PROXY_FPS = 24
+
+
+def even(x):
+    """Round a dimension down to an even number of pixels (yuv420p needs it)"""
+    return max(2, int(x) // 2 * 2)
+
+
+def proxy_path(output):
+    """Proxy renders go next to the final output: edit.mp4 -> edit_proxy.mp4"""
+    base, ext = os.path.splitext(output)
+    return base + "_proxy" + ext
+
+
+def scale_overlay(overlay, size):
+    """Resize an RGBA overlay to a new frame size"""
+    return np.asarray(Image.fromarray(overlay).resize(tuple(size), Image.BILINEAR))
+
+
+def render_edit(source_path, edit, output, audio=None, size=None, fps=60,
+                max_duration=None, overlay=None, quality="lanczos", bitrate='12000k',
+                preset='medium', threads=4, workers=None, proxy=False, cache_dir=None, flashes=None):
+    """Plan and render an edit list from one source video to an output file
+
+    workers:   render segments in that many processes and stream-copy them together
+               (default with a cache_dir: one per core)
+    proxy:     quick 1/4 resolution, 24 fps, ultrafast preview written to *_proxy.mp4
+    cache_dir: segment cache - only segments that changed since the last render are encoded
+    flashes:   [(time, duration, intensity[, color])] blended over the output timeline
+    """
+    print("\n[1/4] Loading source video...")
+    source = SourceReader(source_path)
+    resolution = None
+    if proxy:
+        # Let ffmpeg downscale while decoding and shrink the whole render with it
+        src_w, src_h = source.size
+        resolution = (even(src_w * PROXY_SCALE), even(src_h * PROXY_SCALE))
+        source.close()
+        source = SourceReader(source_path, target_resolution=resolution)
+        if size:
+            size = (even(size[0] * PROXY_SCALE), even(size[1] * PROXY_SCALE))
+        if overlay is not None:
+            overlay = scale_overlay(overlay, size or resolution)
+        fps = min(fps, PROXY_FPS)
+        output = proxy_path(output)
+        quality, bitrate, preset = "bilinear", None, 'ultrafast'
+        print(f"      Proxy render: decoding at {resolution}, {fps} fps")
+    print(f"      Source: {source.duration:.1f}s @ {source.size}, {len(source.keyframes)} keyframes")
+
+    audio_clip = None
+    if audio and os.path.exists(audio):
+        audio_clip = AudioFileClip(audio)
+        print(f"      Audio: {audio_clip.duration:.1f}s")
+    elif audio:
+        print(f"      Warning: Audio file not found at {audio}")
+        audio = None
+
+    print(f"\n[2/4] Planning {len(edit)} clips...")
+    plan = plan_timeline(edit, source.duration, fps)
+    if not plan:
+        source.close()
+        raise ValueError(f"Edit for {output} has no frames to render "
+                         f"({len(edit)} clips, shorter than one frame at {fps} fps)")
+    print_plan(plan)
+    if proxy:
+        # Shake is measured in output pixels
+        for seg in plan:
+            if seg.get("shake"):
+                seg["shake"] *= PROXY_SCALE
+
+    duration = plan[-1]["out_end"]
+    if max_duration:
+        duration = min(duration, max_duration)
+    if audio_clip is not None:
+        duration = min(duration, audio_clip.duration)
+    print(f"      Final duration: {duration:.2f}s")
+    if audio_clip is not None:
+        audio_clip.close()
+
+    # Only the overlay's visible box is blended into each frame
+    if overlay is not None:
+        overlay = compile_overlay(overlay)
+        if overlay is not None:
+            print_overlay(overlay, size or source.size)
+
+    if workers or cache_dir:
+        source.close()
+        print(f"\n[3/4] Rendering segments...")
+        render_parallel(source_path, plan, output, int(round(duration * fps)), fps, audio,
+                        size, overlay, quality, bitrate, preset, workers, resolution, cache_dir,
+                        flash_events(plan, flashes, fps))
+        print(f"\n[4/4] Exported to {output}")
+        return plan
+
+    print("\n[3/4] Compiling segment kernels...")
+    # Compile every segment (grades, masks) before the first frame is rendered
+    kernels = [compile_segment(seg, source, size, quality) for seg in plan]
+
+    print(f"\n[4/4] Exporting to {output}...")
+    end_frame = int(round(duration * fps))
+    with FrameWriter(output, size or source.size, fps, bitrate=bitrate, preset=preset,
+                     threads=threads, audio=audio, duration=end_frame / fps) as writer:
+        render_frames(kernels, plan, writer, 0, end_frame, fps, overlay,
+                      flash_events(plan, flashes, fps))
+
+    print(f"      Decoded {source.decoded} source frames in {source.seeks} seeks")
+    print(f"      Frame cache: {FRAME_CACHE.stats()}")
+    source.close()
+
+    return plan
@@ -0,0 +1,187 @@
+"""
+Source video reader for the edit engine
+Knows where a source's keyframes are, so every frame fetch either reads forward
+or seeks - whichever decodes fewer frames. Decoded frames go through a shared
+LRU cache, so fetching the same source frame again never re-decodes it.
+
+The keyframe index is built once per source with ffmpeg and cached next to
+the asset as <video>.keyframes.json (rebuilt when the file size or mtime changes).
+"""
+
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+from collections import OrderedDict
+import bisect
+import json
+import os
+import re
+import subprocess
+
+
+# ============ KEYFRAME INDEX ============
+
+def index_path(video_path):
+    """Where the keyframe index of a video is cached"""
+    return video_path + ".keyframes.json"
+
+
+def scan_keyframes(video_path):
+    """Keyframe timestamps (seconds) of the first video stream, decoding keyframes only"""
+    cmd = [FFMPEG_BINARY, "-hide_banner", "-nostats", "-skip_frame", "nokey",
+           "-i", video_path, "-map", "0:v:0", "-vf", "showinfo", "-f", "null", "-"]
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    times = [float(t) for t in re.findall(r"pts_time:\s*(-?[0-9.]+)", result.stderr)]
+    return sorted(set(times))
+
+
+def keyframe_index(video_path):
+    """Cached keyframe timestamps of a video, rebuilt when the file changes"""
+    stat = os.stat(video_path)
+    path = index_path(video_path)
+
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+        if cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime:
+            return cached["keyframes"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    keyframes = scan_keyframes(video_path)
+    try:
+        with open(path, 'w') as f:
+            json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "keyframes": keyframes}, f)
+    except OSError:
+        print(f"      Warning: could not cache keyframe index at {path}")
+    return keyframes
+
+
+# ============ FRAME CACHE ============
+
+# Decoded RGB frames kept per render - parallel renders split it between their workers
+FRAME_CACHE_BYTES = 512 * 1024 * 1024
+
+
+class FrameCache:
+    """Byte-budgeted LRU of decoded frames keyed by (source path, resolution, frame index)"""
+
+    def __init__(self, max_bytes=FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        frame = self.frames.get(key)
+        if frame is None:
+            self.misses += 1
+            return None
+        self.frames.move_to_end(key)
+        self.hits += 1
+        return frame
+
+    def put(self, key, frame):
+        if key in self.frames or frame.nbytes > self.max_bytes:
+            return
+        # Cached frames are shared between callers, so they must never be written to
+        frame.flags.writeable = False
+        self.frames[key] = frame
+        self.bytes += frame.nbytes
+        self.evict()
+
+    def evict(self):
+        while self.bytes > self.max_bytes:
+            _, old = self.frames.popitem(last=False)
+            self.bytes -= old.nbytes
+
+    def resize(self, max_bytes):
+        """Change the byte budget, dropping the oldest frames if it shrank"""
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def clear(self):
+        self.frames.clear()
+        self.bytes = 0
+
+    def stats(self):
+        """One-line summary for progress output"""
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0
+        return (f"{self.hits} hits / {self.misses} misses ({rate:.0f}%), "
+                f"{len(self.frames)} frames, {self.bytes / 2**20:.0f} MB")
+
+
+# Shared by every reader in the process
+FRAME_CACHE = FrameCache()
+
+
+# ============ SOURCE READER ============
+
+class SourceReader:
+    """Keyframe-aware frame reader with the clip interface the kernels use (size, fps, duration, get_frame)"""
+
+    def __init__(self, path, target_resolution=None, cache=FRAME_CACHE):
+        self.path = path
+        self.target_resolution = target_resolution
+        self.cache = cache
+        self.reader = FFMPEG_VideoReader(path, target_resolution=target_resolution)
+        self.size = tuple(self.reader.size)
+        self.fps = self.reader.fps
+        self.duration = self.reader.duration
+        self.keyframes = [int(t * self.fps + 0.00001) for t in keyframe_index(path)]
+
+        # Decode statistics
+        self.seeks = 0
+        self.decoded = 0
+
+    def frame_number(self, t):
+        """Index of the source frame shown at time t"""
+        return self.reader.get_frame_number(t)
+
+    def keyframe_before(self, n):
+        """Index of the last keyframe at or before frame n"""
+        i = bisect.bisect_right(self.keyframes, n) - 1
+        return self.keyframes[i] if i >= 0 else 0
+
+    def seek_cost(self, n):
+        """Frames decoded to reach frame n from a fresh seek"""
+        # The reader seeks to 1s before the target, so ffmpeg lands on the keyframe before that
+        return n - self.keyframe_before(max(0, n - int(self.fps))) + 1
+
+    def read_cost(self, n):
+        """Frames decoded to reach frame n from the current position (None if behind it)"""
+        if self.reader.proc is None or n < self.reader.pos:
+            return None
+        return n - self.reader.pos + 1
+
+    def get_frame(self, t):
+        """RGB frame at time t, from the cache or by reading forward or seeking - whichever is cheaper"""
+        reader = self.reader
+        n = self.frame_number(t)
+
+        key = (self.path, self.target_resolution, n)
+        if self.cache is not None:
+            frame = self.cache.get(key)
+            if frame is not None:
+                return frame
+        elif reader.proc is not None and n == reader.pos - 1:
+            return reader.last_read
+
+        forward = self.read_cost(n)
+        seek = self.seek_cost(n)
+        if forward is not None and (forward <= seek if self.keyframes else forward <= 100):
+            reader.skip_frames(n - reader.pos)
+            reader.read_frame()
+            self.decoded += forward
+        else:
+            reader.initialize(t)
+            self.seeks += 1
+            self.decoded += seek
+
+        if self.cache is not None:
+            self.cache.put(key, reader.last_read)
+        return reader.last_read
+
+    def close(self):
+        self.reader.close()
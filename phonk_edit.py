@@ -3,11 +3,13 @@ Phonk Style Video Editor with Watermark
 Creates a stylized edit with "finez" watermark
 """
 
-from moviepy import *
+from moviepy import VideoFileClip
 import numpy as np
-from PIL import Image, ImageDraw, ImageFont
 import os
 
+from edit_engine import render_edit
+from text_cache import HELVETICA, SF_MONO, load_font, offset_glow, place_run, text_run
+
 # ============ CONFIGURATION ============
 INPUT_VIDEO = "/Users/satyendra/Desktop/Atharv/Assets/＂The Legend🗿＂ - Steve Harrington 'Stranger Things 5 World premiere' Edit ｜ MONTAGEM NOCHE (Slowed) [1aJ2hJ48HU8].mp4"
 OUTPUT_VIDEO = "/Users/satyendra/Desktop/Atharv/Assets/finez_edit.mp4"
@@ -26,24 +28,14 @@ CONTRAST_BOOST = 1.1
 
 
 def create_text_watermark(text, size, font_size=50, color=(255, 255, 255)):
-    """Create a text watermark image with glow effect"""
+    """Create a text watermark image with glow effect (see text_cache)"""
     width, height = size
     
-    # Create transparent image
-    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    
-    # Try to use a cool font, fallback to default
-    try:
-        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-    except:
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/SFNSMono.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+    # Try to use a cool font, fallback to default (loaded once per process)
+    font = load_font(font_size, HELVETICA, SF_MONO)
     
     # Get text bounding box
-    bbox = draw.textbbox((0, 0), text, font=font)
+    bbox = font.getbbox(text)
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     
@@ -65,44 +57,11 @@ def create_text_watermark(text, size, font_size=50, color=(255, 255, 255)):
         x = (width - text_width) // 2
         y = (height - text_height) // 2
     
-    # Draw glow effect (multiple layers)
-    glow_color = (color[0], color[1], color[2], 30)
-    for offset in range(8, 0, -2):
-        draw.text((x - offset, y), text, font=font, fill=glow_color)
-        draw.text((x + offset, y), text, font=font, fill=glow_color)
-        draw.text((x, y - offset), text, font=font, fill=glow_color)
-        draw.text((x, y + offset), text, font=font, fill=glow_color)
-    
-    # Draw main text
+    # Glow layers + main text, rasterized once per text/font/color
     alpha = int(255 * WATERMARK_OPACITY)
-    draw.text((x, y), text, font=font, fill=(color[0], color[1], color[2], alpha))
-    
-    return np.array(img)
-
-
-def apply_vignette(frame):
-    """Apply vignette effect to frame"""
-    h, w = frame.shape[:2]
-    
-    # Create vignette mask
-    Y, X = np.ogrid[:h, :w]
-    center_y, center_x = h / 2, w / 2
-    
-    # Calculate distance from center (normalized)
-    dist = np.sqrt((X - center_x)**2 + (Y - center_y)**2)
-    max_dist = np.sqrt(center_x**2 + center_y**2)
-    dist = dist / max_dist
-    
-    # Create vignette (darker at edges)
-    vignette = 1 - (dist ** 2) * 0.5
-    vignette = np.clip(vignette, 0.3, 1)
-    
-    # Apply to frame
-    result = frame.astype(np.float32)
-    for i in range(3):
-        result[:, :, i] = result[:, :, i] * vignette
-    
-    return np.clip(result, 0, 255).astype(np.uint8)
+    run = text_run(text, font, fill=(color[0], color[1], color[2], alpha),
+                   glow=offset_glow(8, 30, step=2, color=tuple(color)))
+    return place_run(size, run, x, y)
 
 
 def apply_color_grade(frame):
@@ -120,20 +79,6 @@ def apply_color_grade(frame):
     return np.clip(result, 0, 255).astype(np.uint8)
 
 
-def process_frame(get_frame, t):
-    """Apply all effects to a single frame"""
-    frame = get_frame(t)
-    result = frame
-    
-    if ADD_COLOR_GRADE:
-        result = apply_color_grade(result)
-    
-    if ADD_VIGNETTE:
-        result = apply_vignette(result)
-    
-    return result
-
-
 def main():
     print("=" * 50)
     print("PHONK STYLE VIDEO EDITOR")
@@ -152,9 +97,13 @@ def main():
     video = VideoFileClip(INPUT_VIDEO)
     print(f"Video loaded: {video.duration:.2f}s, {video.size[0]}x{video.size[1]}")
     
-    # Apply effects to video
+    # Effects: color grade + vignette (darker at edges), compiled into one frame kernel
     print("\nApplying effects (color grade + vignette)...")
-    processed_video = video.transform(process_frame)
+    edit = [{"src": 0, "duration": video.duration, "speed": 1.0}]
+    if ADD_COLOR_GRADE:
+        edit[0]["grade"] = apply_color_grade
+    if ADD_VIGNETTE:
+        edit[0]["vignette"] = (0.5, 2, 0.3)
     
     # Create watermark
     print(f"Adding '{WATERMARK_TEXT}' watermark...")
@@ -165,31 +114,15 @@ def main():
         color=WATERMARK_COLOR
     )
     
-    # Create watermark clip
-    watermark_clip = ImageClip(watermark_img).with_duration(video.duration)
-    
-    # Composite video with watermark
-    final_video = CompositeVideoClip([processed_video, watermark_clip])
-    
-    # Copy audio from original
-    final_video = final_video.with_audio(video.audio)
+    fps = video.fps
+    has_audio = video.audio is not None
+    video.close()
     
-    # Write output
+    # Write output, audio copied from the original (if it has any)
     print(f"\nRendering to: {OUTPUT_VIDEO}")
     print("This may take a few minutes...")
-    
-    final_video.write_videofile(
-        OUTPUT_VIDEO,
-        codec='libx264',
-        audio_codec='aac',
-        fps=video.fps,
-        preset='medium',
-        threads=4
-    )
-    
-    # Cleanup
-    video.close()
-    final_video.close()
+    render_edit(INPUT_VIDEO, edit, OUTPUT_VIDEO, audio=INPUT_VIDEO if has_audio else None, fps=fps,
+                overlay=watermark_img, bitrate=None)
     
     print("\n" + "=" * 50)
     print("DONE!")
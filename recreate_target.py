@@ -4,17 +4,20 @@ Uses the exact timing structure from target.mp4
 Applies to YOUR clips from ST5_Premiere.mp4
 """
 
-from moviepy import *
-from moviepy.video import fx
 import numpy as np
-from PIL import Image
 import os
 
+from auto_assemble import assemble, print_assembly
+from edit_engine import edit_from_cuts, render_edit
+from shot_index import build_shot_index
+
 # === PATHS ===
 ASSETS = "/Users/satyendra/Desktop/Atharv/Assets"
 SOURCE = os.path.join(ASSETS, "ST5_Premiere.mp4")
 TARGET = os.path.join(ASSETS, "target.mp4")  # Reference for audio
 OUTPUT = os.path.join(ASSETS, "steve_RECREATED.mp4")
+PREVIEW = False  # True = fast low-res proxy render (writes *_proxy.mp4) while tuning timings
+SEGMENT_CACHE = os.path.join(ASSETS, "segment_cache")  # unchanged clips are reused between renders
 
 # === EXACT TIMING FROM TARGET ANALYSIS ===
 # (start_time, end_time, clip_type)
@@ -54,6 +57,8 @@ EDIT_STRUCTURE = [
 # Pick the best Steve moments from ST5_Premiere.mp4
 # Format: (source_start_time, speed_factor)
 # speed_factor: 0.5 = half speed (slow-mo), 1.0 = normal
+# Set YOUR_CLIPS = None to assemble them from the ranked shots of the source instead
+# (auto_assemble.assemble: every slot gets its own shot, slowed down where needed).
 YOUR_CLIPS = [
     (10, 1.0),    # 1 - Opening
     (35, 1.0),    # 2
@@ -85,14 +90,11 @@ YOUR_CLIPS = [
     (125, 0.5),   # 28 - SLOW ending
 ]
 
-# Flash timestamps (from target analysis)
-FLASH_TIMES = [10.93, 16.17]
-
+# Assembled clips only: bump VARIANT for an alternative assembly of the same structure (A/B tests)
+VARIANT = 0
 
-def create_flash(duration, size, intensity=0.95):
-    """Create white flash frame"""
-    c = tuple([int(255 * intensity)] * 3)
-    return ColorClip(size=size, color=c, duration=duration)
+# Flash timestamps (from target analysis) - the cuts there open on a solid flash frame
+FLASH_TIMES = [10.93, 16.17]
 
 
 def apply_color_grade(frame):
@@ -122,118 +124,36 @@ def create_edit():
     print("  RECREATING TARGET EDIT WITH YOUR CLIPS")
     print("=" * 60)
     
-    # Load source
-    print("\n[1/5] Loading source video...")
-    source = VideoFileClip(SOURCE)
-    print(f"      Source: {source.duration:.1f}s @ {source.size}")
-    
-    # Load target for audio
-    print("\n[2/5] Loading target audio...")
-    target = VideoFileClip(TARGET)
-    audio = target.audio
-    print(f"      Audio: {audio.duration:.1f}s")
-    
-    # Target size (match target aspect ratio 720x800 = 9:10)
-    target_size = (720, 800)
-    
-    print(f"\n[3/5] Processing {len(EDIT_STRUCTURE)} clips...")
-    processed_clips = []
-    
-    for i, ((out_start, out_end, clip_type), (src_start, speed)) in enumerate(zip(EDIT_STRUCTURE, YOUR_CLIPS)):
-        target_duration = out_end - out_start
-        
-        # Calculate how much source footage we need
-        src_duration = target_duration * speed
-        
-        # Ensure we don't exceed source
-        if src_start + src_duration > source.duration:
-            src_start = max(0, source.duration - src_duration - 1)
-        
-        print(f"      Clip {i+1:2d}/{len(EDIT_STRUCTURE)}: {out_start:.2f}-{out_end:.2f}s "
-              f"[{clip_type:6s}] src={src_start}s speed={speed}x")
-        
-        # Extract clip
-        clip = source.subclipped(src_start, src_start + src_duration)
-        
-        # Apply speed change for slow-mo
-        if speed != 1.0:
-            clip = clip.with_effects([fx.MultiplySpeed(speed)])
-        
-        # Trim to exact duration
-        if clip.duration > target_duration:
-            clip = clip.subclipped(0, target_duration)
-        
-        # Resize to target aspect ratio (center crop to 9:10)
-        w, h = clip.size
-        target_ratio = 9/10
-        current_ratio = w/h
-        
-        if current_ratio > target_ratio:
-            # Too wide, crop sides
-            new_w = int(h * target_ratio)
-            x_offset = (w - new_w) // 2
-            clip = clip.cropped(x1=x_offset, x2=x_offset + new_w)
-        else:
-            # Too tall, crop top/bottom
-            new_h = int(w / target_ratio)
-            y_offset = (h - new_h) // 2
-            clip = clip.cropped(y1=y_offset, y2=y_offset + new_h)
-        
-        # Resize to exact target size
-        clip = clip.resized(target_size)
-        
-        # Apply color grading
-        clip = clip.image_transform(apply_color_grade)
-        
-        # Add flash before certain clips
-        if out_start in FLASH_TIMES or (i > 0 and EDIT_STRUCTURE[i-1][1] in [10.93]):
-            flash = create_flash(0.03, target_size, 0.9)
-            # Trim clip to make room for flash
-            if clip.duration > 0.03:
-                clip = clip.subclipped(0.03, clip.duration)
-            clip = concatenate_videoclips([flash, clip])
-        
-        processed_clips.append(clip)
-    
-    # Concatenate all clips
-    print("\n[4/5] Concatenating clips...")
-    final = concatenate_videoclips(processed_clips, method="compose")
-    
-    print(f"      Final duration: {final.duration:.2f}s (target: 18.20s)")
-    
-    # Trim to exact target duration
-    if final.duration > 18.20:
-        final = final.subclipped(0, 18.20)
-    
-    # Add audio from target
-    print("      Adding audio...")
-    audio_trimmed = audio.subclipped(0, min(final.duration, audio.duration))
-    final = final.with_audio(audio_trimmed)
+    output = OUTPUT
+    if YOUR_CLIPS is not None:
+        your_clips = YOUR_CLIPS
+    else:
+        # Pick a source shot for every slot
+        print("\nAssembling clips from the source shots...")
+        your_clips = assemble(EDIT_STRUCTURE, build_shot_index(SOURCE), variant=VARIANT)
+        print_assembly(EDIT_STRUCTURE, your_clips)
+        if VARIANT:
+            output = OUTPUT.replace(".mp4", f"_v{VARIANT}.mp4")
     
-    # Export
-    print(f"\n[5/5] Exporting to {OUTPUT}...")
-    print("      This will take a few minutes...")
+    # Flash before the clips that start on a flash
+    flash_indices = [i for i, (start, _, _) in enumerate(EDIT_STRUCTURE) if start in FLASH_TIMES]
     
-    final.write_videofile(
-        OUTPUT,
-        fps=60,
-        codec='libx264',
-        audio_codec='aac',
-        bitrate='8000k',
-        preset='medium',
-        threads=4
-    )
+    edit = edit_from_cuts(EDIT_STRUCTURE, your_clips, flash_indices=flash_indices,
+                          flash=(0.03, 0.9), grade=apply_color_grade)
     
-    # Cleanup
-    source.close()
-    target.close()
-    final.close()
+    # Target size (match target aspect ratio 720x800 = 9:10), audio from target
+    render_edit(SOURCE, edit, output, audio=TARGET, size=(720, 800),
+                max_duration=18.20, bitrate='8000k', proxy=PREVIEW,
+                cache_dir=SEGMENT_CACHE)
     
     print("\n" + "=" * 60)
-    print(f"  ✓ DONE! Output: {OUTPUT}")
+    print(f"  ✓ DONE! Output: {output}")
     print("=" * 60)
-    print("\nNow you can replace the source timestamps in YOUR_CLIPS")
-    print("with your preferred moments from ST5_Premiere.mp4!")
+    if YOUR_CLIPS is not None:
+        print("\nNow you can replace the source timestamps in YOUR_CLIPS")
+        print("with your preferred moments from ST5_Premiere.mp4!")
+    else:
+        print("\nSet VARIANT = 1, 2, ... for alternative assemblies of the same edit")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""
+Shot index for the long source videos
+Splits a source into shots from its stored frame features (one low-res scan)
+and ranks them, so an edit can ask for "the best 1s shots" instead of
+scrubbing through the premiere footage by hand
+
+Each shot: {"start", "end", "duration", "motion", "sharpness", "contrast",
+"skin", "score"} - times in source seconds. The index is saved as shots.json
+in the video's feature store directory.
+"""
+
+import numpy as np
+import json
+import os
+
+from video_analysis import FEATURE_STORE, THUMB_WIDTH, cut_frames, feature_dir, scan_video
+
+PREMIERE = "/Users/satyendra/Desktop/Atharv/Assets/ST5_Premiere.mp4"
+
+MIN_SHOT = 0.3       # seconds - anything shorter is a flash or a glitch, not a usable shot
+IDEAL_SHOT = 2.0     # seconds - longer shots stop earning a length bonus
+SHOT_INDEX_VERSION = 1
+
+# How much each (normalized) quality counts towards a shot's score
+WEIGHTS = {
+    "motion": 1.0,     # something is happening
+    "sharpness": 1.0,  # in focus, not motion-blurred
+    "contrast": 0.5,   # not washed out or crushed
+    "skin": 1.0,       # people in the middle of the frame
+}
+
+
+# ============ SHOTS ============
+
+def shot_bounds(features, sensitivity=4.0):
+    """(start_frame, end_frame) of every shot at least MIN_SHOT long"""
+    fps = features["fps"]
+    n = len(features["brightness"])
+    cuts = [0] + [int(i) for i in cut_frames(features, sensitivity)] + [n]
+
+    bounds = []
+    for start, end in zip(cuts[:-1], cuts[1:]):
+        if (end - start) / fps >= MIN_SHOT:
+            bounds.append((start, end))
+    return bounds
+
+
+def robust_z(values):
+    """Median/IQR normalized values - one odd shot can't squash the rest"""
+    values = np.asarray(values, dtype=np.float64)
+    q1, median, q3 = np.percentile(values, [25, 50, 75]) if len(values) else (0, 0, 0)
+    return (values - median) / max(q3 - q1, 1e-6)
+
+
+def score_shots(shots):
+    """Add a score to every shot: weighted qualities + a bonus for usable length"""
+    if not shots:
+        return shots
+    total = np.zeros(len(shots))
+    for name, weight in WEIGHTS.items():
+        total += weight * np.clip(robust_z([shot[name] for shot in shots]), -3, 3)
+    lengths = np.array([shot["duration"] for shot in shots])
+    total += np.log2(np.minimum(lengths, IDEAL_SHOT) / MIN_SHOT)
+
+    for shot, score in zip(shots, total):
+        shot["score"] = round(float(score), 3)
+    return shots
+
+
+def measure_shots(features, bounds):
+    """Average per-frame qualities over each shot"""
+    fps = features["fps"]
+    shots = []
+    for start, end in bounds:
+        # The cut frame itself carries the jump from the previous shot
+        inner = slice(start + 1, end) if end - start > 1 else slice(start, end)
+        shots.append({
+            "start": round(start / fps, 3),
+            "end": round(end / fps, 3),
+            "duration": round((end - start) / fps, 3),
+            "motion": round(float(np.mean(features["motion"][inner])), 4),
+            "sharpness": round(float(np.mean(features["sharpness"][start:end])), 3),
+            "contrast": round(float(np.mean(features["contrast"][start:end])), 3),
+            "skin": round(float(np.mean(features["skin"][start:end])), 4),
+        })
+    return shots
+
+
+# ============ INDEX ============
+
+def build_shot_index(path, sensitivity=4.0, store=FEATURE_STORE, rebuild=False):
+    """Ranked shots of a video (best first), cached next to its stored features"""
+    index_path = os.path.join(feature_dir(path, THUMB_WIDTH, store), "shots.json")
+    if not rebuild:
+        try:
+            with open(index_path) as f:
+                cached = json.load(f)
+            if cached["version"] == SHOT_INDEX_VERSION and cached["sensitivity"] == sensitivity:
+                return cached["shots"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    features = scan_video(path, store=store)
+    shots = score_shots(measure_shots(features, shot_bounds(features, sensitivity)))
+    shots.sort(key=lambda shot: shot["score"], reverse=True)
+
+    try:
+        with open(index_path, 'w') as f:
+            json.dump({"version": SHOT_INDEX_VERSION, "sensitivity": sensitivity, "shots": shots}, f)
+    except OSError:
+        print(f"Warning: could not save shot index to {index_path}")
+    return shots
+
+
+def query_shots(shots, min_duration=0.0, max_duration=None, start=0.0, end=None,
+                exclude=(), top=None):
+    """Best shots matching a length / source range, skipping any overlapping exclude ranges"""
+    found = []
+    for shot in shots:
+        if shot["duration"] < min_duration or (max_duration and shot["duration"] > max_duration):
+            continue
+        if shot["start"] < start or (end is not None and shot["end"] > end):
+            continue
+        if any(shot["start"] < x_end and x_start < shot["end"] for x_start, x_end in exclude):
+            continue
+        found.append(shot)
+        if top and len(found) >= top:
+            break
+    return found
+
+
+def print_shots(shots, top=20):
+    """Print the best shots as a table"""
+    print(f"  {'#':>3}  {'start':>7}  {'dur':>5}  {'score':>6}  {'motion':>6}  {'sharp':>6}  {'skin':>5}")
+    for i, shot in enumerate(shots[:top], 1):
+        print(f"  {i:3d}  {shot['start']:7.2f}  {shot['duration']:5.2f}  {shot['score']:6.2f}  "
+              f"{shot['motion']:6.3f}  {shot['sharpness']:6.1f}  {shot['skin']:5.2f}")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("SHOT INDEX: ST5 Premiere")
+    print("=" * 60)
+
+    shots = build_shot_index(PREMIERE)
+    print(f"\n{len(shots)} shots, best first:\n")
+    print_shots(shots)
@@ -25,16 +25,18 @@ Reference edit structure (30 cuts):
 - 16.20-18.20s: Final flash sequence
 """
 
-from moviepy import *
 import numpy as np
-from PIL import Image
 import os
 
+from edit_engine import edit_from_cuts, render_edit
+
 # === PATHS ===
 ASSETS = "/Users/satyendra/Desktop/Atharv/Assets"
 SOURCE = os.path.join(ASSETS, "ST5_Premiere.mp4")
 AUDIO = os.path.join(ASSETS, "SteveHH.mp3")
 OUTPUT = os.path.join(ASSETS, "steve_legend_EXACT.mp4")
+PREVIEW = False  # True = fast low-res proxy render (writes *_proxy.mp4) while tuning timings
+SEGMENT_CACHE = os.path.join(ASSETS, "segment_cache")  # unchanged clips are reused between renders
 
 # === EXACT CUT TIMINGS from reference ===
 # (output_start, output_end) - these are the timestamps in the final edit
@@ -109,12 +111,6 @@ SOURCE_CLIPS = [
 ]
 
 
-def create_flash(duration, size, intensity=0.9):
-    """Create white flash"""
-    c = tuple([int(255 * intensity)] * 3)
-    return ColorClip(size=size, color=c, duration=duration)
-
-
 def apply_color_grade(frame):
     """Cinematic color grading matching reference style"""
     f = frame.astype(np.float32)
@@ -142,100 +138,12 @@ def create_edit():
     print("  STEVE HARRINGTON - THE LEGEND - EXACT REPLICA")
     print("=" * 60)
     
-    # Load source
-    print("\n[1/5] Loading source video...")
-    source = VideoFileClip(SOURCE)
-    video_size = source.size
-    print(f"      Source: {source.duration:.1f}s @ {video_size}")
-    
-    # Load audio
-    print("\n[2/5] Loading audio...")
-    audio = AudioFileClip(AUDIO)
-    print(f"      Audio: {audio.duration:.1f}s")
-    
-    # Process each clip
-    print(f"\n[3/5] Processing {len(CUTS)} clips...")
-    processed_clips = []
-    
-    # Flash timestamps from reference
-    flash_indices = [7, 16, 27]  # Clips that should have flash before them
-    
-    for i, ((out_start, out_end), (src_start, speed)) in enumerate(zip(CUTS, SOURCE_CLIPS)):
-        target_duration = out_end - out_start
-        
-        # Calculate source duration needed (for slow-mo, we need less source)
-        # If speed=0.5, output is 2x longer, so we need target_duration * speed of source
-        src_duration = target_duration * speed
-        
-        # Make sure we don't exceed source
-        if src_start + src_duration > source.duration:
-            src_start = max(0, source.duration - src_duration - 1)
-        
-        print(f"      Clip {i+1}/{len(CUTS)}: {out_start:.2f}-{out_end:.2f}s "
-              f"(src: {src_start}s for {src_duration:.2f}s, speed: {speed}x -> {target_duration:.2f}s output)")
-        
-        # Extract clip with enough source material
-        clip = source.subclipped(src_start, src_start + src_duration)
-        
-        # Apply speed change (1/speed because MoviePy's speed_scaled is inverse)
-        if speed != 1.0:
-            clip = clip.with_speed_scaled(1/speed)
-        
-        # Trim to exact target duration
-        if clip.duration > target_duration:
-            clip = clip.subclipped(0, target_duration)
-        elif clip.duration < target_duration - 0.01:
-            # If clip is too short, extend by looping or freezing last frame
-            print(f"        Warning: Clip {i+1} is {clip.duration:.2f}s, need {target_duration:.2f}s")
-        
-        # Apply color grading
-        clip = clip.image_transform(apply_color_grade)
-        
-        # Add flash for specific cuts
-        if i in flash_indices:
-            flash = create_flash(0.05, video_size, 0.85)
-            # Reduce clip duration to make room for flash
-            if clip.duration > 0.05:
-                clip = clip.subclipped(0.05, clip.duration)
-            clip = concatenate_videoclips([flash, clip])
-        
-        processed_clips.append(clip)
-    
-    # Concatenate
-    print("\n[4/5] Concatenating clips...")
-    final = concatenate_videoclips(processed_clips, method="compose")
-    
-    # Trim to exact audio length
-    target_duration = min(audio.duration, 18.2)
-    if final.duration > target_duration:
-        final = final.subclipped(0, target_duration)
-    elif final.duration < target_duration:
-        # Extend last clip if needed
-        print(f"      Note: Final is {final.duration:.2f}s, target is {target_duration:.2f}s")
-    
-    # Add audio
-    print("      Adding audio track...")
-    audio_trimmed = audio.subclipped(0, min(final.duration, audio.duration))
-    final = final.with_audio(audio_trimmed)
-    
-    # Export
-    print(f"\n[5/5] Exporting to {OUTPUT}...")
-    print("      This will take a few minutes...")
-    
-    final.write_videofile(
-        OUTPUT,
-        fps=60,
-        codec='libx264',
-        audio_codec='aac',
-        bitrate='12000k',
-        preset='medium',
-        threads=4
-    )
+    # Flash before clips 8, 17 and 28 (from reference)
+    edit = edit_from_cuts(CUTS, SOURCE_CLIPS, flash_indices=[7, 16, 27],
+                          flash=(0.05, 0.85), grade=apply_color_grade)
     
-    # Cleanup
-    source.close()
-    audio.close()
-    final.close()
+    render_edit(SOURCE, edit, OUTPUT, audio=AUDIO, max_duration=18.2, bitrate='12000k', proxy=PREVIEW,
+                cache_dir=SEGMENT_CACHE)
     
     print("\n" + "=" * 60)
     print(f"  ✓ COMPLETE! Output: {OUTPUT}")
@@ -3,15 +3,18 @@ Steve Harrington "THE LEGEND" - FINAL EDIT
 Properly handles slow-motion by extracting more source footage
 """
 
-from moviepy import *
 import numpy as np
 import os
 
+from edit_engine import edit_from_cuts, render_edit
+
 # === PATHS ===
 ASSETS = "/Users/satyendra/Desktop/Atharv/Assets"
 SOURCE = os.path.join(ASSETS, "ST5_Premiere.mp4")
 AUDIO = os.path.join(ASSETS, "SteveHH.mp3")
 OUTPUT = os.path.join(ASSETS, "steve_legend_FINAL.mp4")
+PREVIEW = False  # True = fast low-res proxy render (writes *_proxy.mp4) while tuning timings
+SEGMENT_CACHE = os.path.join(ASSETS, "segment_cache")  # unchanged clips are reused between renders
 
 # === EXACT CUT TIMINGS from reference (30 cuts) ===
 CUTS = [
@@ -50,89 +53,16 @@ def apply_color_grade(frame):
     return np.clip(f, 0, 255).astype(np.uint8)
 
 
-def create_flash(duration, size, intensity=0.9):
-    c = tuple([int(255 * intensity)] * 3)
-    return ColorClip(size=size, color=c, duration=duration)
-
-
 def create_edit():
     print("=" * 60)
     print("  STEVE HARRINGTON - THE LEGEND - FINAL EDIT")
     print("=" * 60)
     
-    source = VideoFileClip(SOURCE)
-    audio = AudioFileClip(AUDIO)
-    video_size = source.size
-    
-    print(f"\nSource: {source.duration:.1f}s, Audio: {audio.duration:.1f}s")
-    print(f"\nProcessing {len(CUTS)} clips...")
-    
-    processed_clips = []
-    flash_indices = [7, 16, 27]
-    
-    for i, ((out_start, out_end), (src_start, speed)) in enumerate(zip(CUTS, SOURCE_CLIPS)):
-        target_duration = out_end - out_start
-        
-        # For slow-mo (speed < 1), we need LESS source footage
-        # because it will be stretched. E.g., 0.5x speed means
-        # 1 second of source becomes 2 seconds of output
-        src_duration_needed = target_duration * speed
-        
-        # Ensure we don't go past source end
-        if src_start + src_duration_needed > source.duration:
-            src_start = max(0, source.duration - src_duration_needed - 0.5)
-        
-        print(f"  {i+1}/{len(CUTS)}: {target_duration:.2f}s output from {src_duration_needed:.2f}s source @ {speed}x")
-        
-        # Extract the source clip
-        clip = source.subclipped(src_start, src_start + src_duration_needed)
-        
-        # Apply slow-motion by changing speed
-        # with_speed_scaled(factor) where factor > 1 = faster, < 1 = slower
-        # To slow down by 0.5x, we use factor = 0.5 (plays at half speed)
-        if speed != 1.0:
-            # This makes the clip play slower, effectively making it longer
-            clip = clip.with_effects([vfx.MultiplySpeed(speed)])
-        
-        # Trim to exact target duration
-        if clip.duration > target_duration:
-            clip = clip.subclipped(0, target_duration)
-        
-        # Apply color grading
-        clip = clip.image_transform(apply_color_grade)
-        
-        # Add flash for specific cuts
-        if i in flash_indices:
-            flash = create_flash(0.05, video_size, 0.85)
-            if clip.duration > 0.05:
-                clip = clip.subclipped(0.05, clip.duration)
-            clip = concatenate_videoclips([flash, clip])
-        
-        processed_clips.append(clip)
-    
-    print("\nConcatenating...")
-    final = concatenate_videoclips(processed_clips, method="compose")
-    
-    print(f"Final duration: {final.duration:.2f}s (target: 18.2s)")
-    
-    # Add audio
-    audio_trimmed = audio.subclipped(0, min(final.duration, audio.duration))
-    final = final.with_audio(audio_trimmed)
-    
-    print(f"\nExporting to {OUTPUT}...")
-    final.write_videofile(
-        OUTPUT,
-        fps=60,
-        codec='libx264',
-        audio_codec='aac',
-        bitrate='12000k',
-        preset='medium',
-        threads=4
-    )
+    edit = edit_from_cuts(CUTS, SOURCE_CLIPS, flash_indices=[7, 16, 27],
+                          flash=(0.05, 0.85), grade=apply_color_grade)
     
-    source.close()
-    audio.close()
-    final.close()
+    render_edit(SOURCE, edit, OUTPUT, audio=AUDIO, bitrate='12000k', proxy=PREVIEW,
+                cache_dir=SEGMENT_CACHE)
     
     print(f"\n✓ DONE! Output: {OUTPUT}")
 
@@ -12,41 +12,22 @@ Features:
 - Vignette overlay
 """
 
-from moviepy import *
 import numpy as np
-from PIL import Image, ImageFilter, ImageDraw
 import os
 
+from edit_engine import render_edit, snap_to_beats
+from beat_detect import analyze_beats
+
 # === PATHS ===
 ASSETS = "/Users/satyendra/Desktop/Atharv/Assets"
 SOURCE = os.path.join(ASSETS, "ST5_Premiere.mp4")
 AUDIO = os.path.join(ASSETS, "SteveHH.mp3")
 OUTPUT = os.path.join(ASSETS, "steve_legend_v3.mp4")
 
-# === BEAT MAP for Montagem Noche (Slowed) ===
-# Precise beat timestamps for cuts
-BEATS = [
-    0.0,    # Intro start
-    2.6,    # First bass hit
-    5.2,    # Build
-    5.8,    # Quick hit
-    6.4,    # Quick hit
-    7.0,    # Quick hit
-    7.6,    # Drop
-    8.4,    # Hit
-    9.0,    # Quick
-    9.6,    # Quick
-    10.2,   # Quick
-    10.8,   # Build
-    11.6,   # Drop
-    12.4,   # Hit
-    13.0,   # Quick
-    13.6,   # Quick
-    14.4,   # Slow section start
-    15.6,   # Hold
-    16.8,   # Final
-    18.0,   # End
-]
+# === BEATS ===
+# Beat timestamps are detected from the track (beat_detect.analyze_beats) and
+# every cut is snapped to the nearest beat
+BEAT_SNAP = 0.25  # seconds a cut may move to land on a beat
 
 # === CLIP DEFINITIONS ===
 # (source_start, clip_duration, speed, effect_type)
@@ -91,24 +72,7 @@ CLIPS = [
 ]
 
 
-def create_vignette(size, intensity=0.4):
-    """Create a vignette mask"""
-    w, h = size
-    # Create radial gradient
-    center_x, center_y = w // 2, h // 2
-    max_dist = np.sqrt(center_x**2 + center_y**2)
-    
-    y, x = np.ogrid[:h, :w]
-    dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
-    
-    # Normalize and create vignette
-    vignette = 1 - (dist / max_dist) * intensity
-    vignette = np.clip(vignette, 0, 1)
-    
-    return vignette
-
-
-def apply_cinematic_grade(frame, vignette=None):
+def apply_cinematic_grade(frame):
     """Heavy cinematic color grading"""
     f = frame.astype(np.float32)
     
@@ -129,76 +93,17 @@ def apply_cinematic_grade(frame, vignette=None):
     highlight_mask = (f.mean(axis=2, keepdims=True) > 180).astype(np.float32)
     f[:, :, 0] = f[:, :, 0] + highlight_mask[:, :, 0] * 5  # Warm highlights
     
-    # Apply vignette if provided
-    if vignette is not None:
-        for c in range(3):
-            f[:, :, c] = f[:, :, c] * vignette
-    
     return np.clip(f, 0, 255).astype(np.uint8)
 
 
-def create_flash(duration, size, intensity=0.5, color="white"):
-    """Create flash transition"""
-    if color == "white":
-        c = tuple([int(255 * intensity)] * 3)
-    elif color == "blue":
-        c = (int(100 * intensity), int(150 * intensity), int(255 * intensity))
-    else:
-        c = (255, 255, 255)
-    return ColorClip(size=size, color=c, duration=duration)
-
-
-def apply_zoom(clip, start_zoom=1.0, end_zoom=1.12):
-    """Apply smooth zoom effect"""
-    def zoom_frame(get_frame, t):
-        frame = get_frame(t)
-        progress = t / max(clip.duration, 0.01)
-        zoom = start_zoom + (end_zoom - start_zoom) * progress
-        
-        h, w = frame.shape[:2]
-        new_h, new_w = int(h / zoom), int(w / zoom)
-        
-        y1 = (h - new_h) // 2
-        x1 = (w - new_w) // 2
-        
-        cropped = frame[y1:y1+new_h, x1:x1+new_w]
-        
-        img = Image.fromarray(cropped)
-        img = img.resize((w, h), Image.LANCZOS)
-        return np.array(img)
-    
-    return clip.transform(zoom_frame)
-
-
-def apply_shake(clip, intensity=3):
-    """Apply camera shake effect"""
-    def shake_frame(get_frame, t):
-        frame = get_frame(t)
-        h, w = frame.shape[:2]
-        
-        # Random offset based on time
-        np.random.seed(int(t * 1000) % 10000)
-        dx = int(np.random.uniform(-intensity, intensity))
-        dy = int(np.random.uniform(-intensity, intensity))
-        
-        # Shift frame
-        shifted = np.zeros_like(frame)
-        
-        src_x1 = max(0, dx)
-        src_x2 = min(w, w + dx)
-        src_y1 = max(0, dy)
-        src_y2 = min(h, h + dy)
-        
-        dst_x1 = max(0, -dx)
-        dst_x2 = min(w, w - dx)
-        dst_y1 = max(0, -dy)
-        dst_y2 = min(h, h - dy)
-        
-        shifted[dst_y1:dst_y2, dst_x1:dst_x2] = frame[src_y1:src_y2, src_x1:src_x2]
-        
-        return shifted
-    
-    return clip.transform(shake_frame)
+# === EFFECTS PER CLIP TYPE ===
+# zoom: (start, end), shake: pixels, flash: (duration, intensity, color)
+EFFECTS = {
+    "impact": {"zoom": (1.0, 1.08), "shake": 2, "flash": (0.04, 0.6)},   # Quick zoom + shake
+    "slowmo": {"zoom": (1.0, 1.15), "flash": (0.08, 0.4, "blue")},      # Smooth zoom
+    "ending": {"zoom": (1.05, 1.0), "flash": (0.05, 0.35)},             # Slow zoom out feel
+    "normal": {"zoom": (1.0, 1.06), "flash": (0.05, 0.35)},             # Subtle zoom
+}
 
 
 def create_edit():
@@ -206,104 +111,24 @@ def create_edit():
     print("  STEVE HARRINGTON - THE LEGEND - ULTIMATE EDIT v3")
     print("=" * 60)
     
-    # Load source
-    print("\n[1/6] Loading source video...")
-    source = VideoFileClip(SOURCE)
-    video_size = source.size
-    print(f"      Source: {source.duration:.1f}s @ {video_size}")
-    
-    # Load audio
-    print("\n[2/6] Loading audio...")
-    audio = AudioFileClip(AUDIO)
-    target_duration = min(audio.duration, 18.2)
-    print(f"      Audio: {audio.duration:.1f}s")
-    
-    # Pre-compute vignette
-    print("\n[3/6] Creating vignette overlay...")
-    vignette = create_vignette(video_size, intensity=0.35)
-    
-    # Process clips
-    print("\n[4/6] Processing clips...")
-    processed_clips = []
-    
+    edit = []
     for i, (start, dur, speed, effect) in enumerate(CLIPS):
-        if start >= source.duration:
-            print(f"      Clip {i+1}: SKIPPED (beyond source)")
-            continue
-        
-        end = min(start + dur, source.duration)
-        print(f"      Clip {i+1}/{len(CLIPS)}: {start}s-{end:.1f}s | {effect} | {speed}x")
-        
-        # Extract clip
-        clip = source.subclipped(start, end)
+        entry = dict(EFFECTS[effect], src=start, duration=dur, speed=speed,
+                     grade=apply_cinematic_grade, vignette=(0.35, 1, 0.0))
         
-        # Apply speed
-        if speed != 1.0:
-            clip = clip.with_speed_scaled(1/speed)
-        
-        # Apply color grading with vignette
-        def grade_with_vignette(frame, vig=vignette):
-            return apply_cinematic_grade(frame, vig)
-        clip = clip.image_transform(grade_with_vignette)
-        
-        # Apply effect-specific processing
-        if effect == "impact":
-            # Quick zoom + slight shake for impact
-            clip = apply_zoom(clip, 1.0, 1.08)
-            clip = apply_shake(clip, intensity=2)
-        elif effect == "slowmo":
-            # Smooth zoom for slow-mo
-            clip = apply_zoom(clip, 1.0, 1.15)
-        elif effect == "ending":
-            # Slow zoom out feel
-            clip = apply_zoom(clip, 1.05, 1.0)
-        else:
-            # Normal - subtle zoom
-            clip = apply_zoom(clip, 1.0, 1.06)
-        
-        # Add flash transition
+        # Flash transition before every clip but the first
         if i > 0:
-            if effect == "impact":
-                flash = create_flash(0.04, video_size, 0.6)
-            elif effect == "slowmo":
-                flash = create_flash(0.08, video_size, 0.4, "blue")
-            else:
-                flash = create_flash(0.05, video_size, 0.35)
-            clip = concatenate_videoclips([flash, clip])
+            entry.update(delay=entry["flash"][0], duration=dur + entry["flash"][0])
+        else:
+            del entry["flash"]
         
-        processed_clips.append(clip)
-    
-    # Concatenate
-    print("\n[5/6] Concatenating clips...")
-    final = concatenate_videoclips(processed_clips, method="compose")
-    
-    # Trim to audio length
-    if final.duration > target_duration:
-        final = final.subclipped(0, target_duration)
-    
-    # Add audio
-    print("      Adding audio track...")
-    audio_trimmed = audio.subclipped(0, min(final.duration, audio.duration))
-    final = final.with_audio(audio_trimmed)
-    
-    # Export
-    print(f"\n[6/6] Exporting to {OUTPUT}...")
-    print("      This will take several minutes...")
+        edit.append(entry)
     
-    final.write_videofile(
-        OUTPUT,
-        fps=60,
-        codec='libx264',
-        audio_codec='aac',
-        bitrate='12000k',
-        preset='medium',
-        threads=4
-    )
+    # Land the cuts on the track's beats
+    beats = analyze_beats(AUDIO)["beats"]
+    edit = snap_to_beats(edit, beats, BEAT_SNAP)
     
-    # Cleanup
-    source.close()
-    audio.close()
-    final.close()
+    render_edit(SOURCE, edit, OUTPUT, audio=AUDIO, max_duration=18.2, bitrate='12000k')
     
     print("\n" + "=" * 60)
     print(f"  ✓ COMPLETE! Output: {OUTPUT}")
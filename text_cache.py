@@ -0,0 +1,114 @@
+"""
+Process-wide cache of fonts and rasterized text
+Every watermark path draws the same few strings in the same few fonts, so a
+font is loaded once per (candidates, size) and a string is rasterized once
+per (text, font, fill, glow) - together with its glow stamps - into a tight
+RGBA run. Rebuilding a watermark is then a dictionary lookup plus a paste.
+
+    font = load_font(45, HELVETICA)
+    run = text_run("finez", font, fill=(255, 255, 255, 204), glow=offset_glow(6, 20))
+    frame = place_run((720, 1280), run, x, y)
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+import os
+
+# macOS system fonts the scripts try first (each falls back to PIL's default font)
+AVENIR_CONDENSED = "/System/Library/Fonts/Avenir Next Condensed.ttc"
+HELVETICA = "/System/Library/Fonts/Helvetica.ttc"
+SF_MONO = "/System/Library/Fonts/SFNSMono.ttf"
+
+FONTS = {}        # (size, candidates) -> font
+TEXT_RUNS = {}    # (text, font, fill, glow) -> (rgba, left, top)
+
+
+# ============ FONTS ============
+
+def load_font(size, *candidates):
+    """First candidate font file (path or (path, index)) that loads at size, else PIL's default - loaded once"""
+    key = (size, candidates)
+    font = FONTS.get(key)
+    if font is not None:
+        return font
+
+    for candidate in candidates:
+        path, index = candidate if isinstance(candidate, tuple) else (candidate, 0)
+        try:
+            font = ImageFont.truetype(path, size, index=index)
+        except OSError:
+            continue
+        print(f"Using {os.path.splitext(os.path.basename(path))[0]}")
+        break
+    else:
+        font = ImageFont.load_default()
+        print("Using default font")
+
+    FONTS[key] = font
+    return font
+
+
+# ============ TEXT RUNS ============
+
+def offset_glow(max_offset, alpha, step=1, fade=False, color=(255, 255, 255)):
+    """Glow stamps ((dx, dy, rgba), ...): the text shifted left/right/up/down, outermost first
+
+    fade: alpha grows toward the text (outermost ring fainter) instead of staying flat
+    """
+    stamps = []
+    for offset in range(max_offset, 0, -step):
+        a = int(alpha * (max_offset + 1 - offset) / max_offset) if fade else alpha
+        for dx, dy in [(-offset, 0), (offset, 0), (0, -offset), (0, offset)]:
+            stamps.append((dx, dy, (*color, a)))
+    return tuple(stamps)
+
+
+def text_run(text, font, fill=(255, 255, 255, 255), glow=()):
+    """(rgba, left, top): text with its glow stamps drawn once into its tight box - cached
+
+    left, top: where the box sits relative to the point the text is drawn at.
+    """
+    key = (text, font, fill, glow)
+    run = TEXT_RUNS.get(key)
+    if run is not None:
+        return run
+
+    # Box covering the text at every stamp offset
+    bl, bt, br, bb = font.getbbox(text)
+    offsets = [(dx, dy) for dx, dy, _ in glow] + [(0, 0)]
+    left = min(dx for dx, _ in offsets) + bl
+    top = min(dy for _, dy in offsets) + bt
+    right = max(dx for dx, _ in offsets) + br
+    bottom = max(dy for _, dy in offsets) + bb
+
+    # Same draw calls as drawing on the full frame, just shifted into the box
+    layer = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    for dx, dy, color in glow:
+        draw.text((dx - left, dy - top), text, font=font, fill=color)
+    draw.text((-left, -top), text, font=font, fill=fill)
+
+    run = TEXT_RUNS[key] = (np.array(layer), left, top)
+    return run
+
+
+def run_slices(shape, run, x, y):
+    """(canvas rows, canvas cols, run rows, run cols) of a run drawn at (x, y), clipped to a canvas shape - or None"""
+    pixels, left, top = run
+    x, y = x + left, y + top
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + pixels.shape[1], shape[1]), min(y + pixels.shape[0], shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return slice(y0, y1), slice(x0, x1), slice(y0 - y, y1 - y), slice(x0 - x, x1 - x)
+
+
+def place_run(size, run, x, y):
+    """Full-frame (height, width, 4) RGBA overlay with the run drawn at (x, y)"""
+    width, height = size
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    box = run_slices(frame.shape, run, x, y)
+    if box is not None:
+        rows, cols, run_rows, run_cols = box
+        frame[rows, cols] = run[0][run_rows, run_cols]
+    return frame
@@ -0,0 +1,59 @@
+"""
+Keyframe timelines for the watermark animations
+Every animated property is a track of (time, value) keys. A whole clip's
+curves come out of one evaluate() call over all frame times, and any subset
+of times can be evaluated on its own (e.g. one worker's frame range).
+
+    timeline = Timeline()
+    timeline.add("bar_x", [(0.5, 10), (2.0, 300)], ease=ease_in_out, integer=True)
+    curves = timeline.evaluate(np.arange(300) / 60)   # {"bar_x": array of 300 values}
+
+Between two keys the value moves from the first to the second along the
+track's easing curve; before the first key and after the last it holds.
+Two keys at the same time make a jump.
+"""
+
+import numpy as np
+
+
+def linear(p):
+    """No easing"""
+    return p
+
+
+def ease_in_out(p):
+    """Smoothstep easing"""
+    return p * p * (3 - 2 * p)
+
+
+class Timeline:
+    """Named keyframe tracks, evaluated for many times at once"""
+
+    def __init__(self):
+        self.tracks = {}
+
+    def add(self, name, keys, ease=linear, integer=False):
+        """Add a track: keys [(time, value)] in time order; integer truncates values like int()"""
+        times = np.array([k[0] for k in keys], dtype=np.float64)
+        values = np.array([k[1] for k in keys], dtype=np.float64)
+        self.tracks[name] = (times, values, ease, integer)
+        return self
+
+    def evaluate(self, times):
+        """{track name: values at times} - one vectorized pass per track"""
+        times = np.asarray(times, dtype=np.float64)
+        return {name: self.evaluate_track(name, times) for name in self.tracks}
+
+    def evaluate_track(self, name, times):
+        key_times, key_values, ease, integer = self.tracks[name]
+        if len(key_times) == 1:
+            values = np.full(times.shape, key_values[0])
+        else:
+            # Segment each time falls in (the last key at or before it)
+            i = np.clip(np.searchsorted(key_times, times, side='right') - 1, 0, len(key_times) - 2)
+            t0, t1 = key_times[i], key_times[i + 1]
+            span = t1 - t0
+            progress = np.clip((times - t0) / np.where(span > 0, span, 1), 0, 1)
+            progress[span <= 0] = 1.0
+            values = key_values[i] + (key_values[i + 1] - key_values[i]) * ease(progress)
+        return np.trunc(values).astype(np.int64) if integer else values
@@ -0,0 +1,342 @@
+"""
+Streaming video analysis for the reference and target edits
+Decodes a video once, front to back, as small thumbnails and derives compact
+per-frame features from them; cut and flash events are read off the features
+
+Features per frame: brightness, diff (mean absolute difference to the previous
+frame), motion (fraction of pixels that changed), sharpness (mean Laplacian),
+contrast (luma standard deviation), skin (fraction of skin-toned pixels in the
+center - a cheap stand-in for "there's a face"), a 48-bin color histogram and
+a 64-bit difference hash. They are kept in a feature store keyed by the video's
+content hash - one .npy per column, opened memory-mapped - so cut thresholds
+can be re-tuned and other scripts can query them without decoding again.
+"""
+
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from numpy.lib.stride_tricks import sliding_window_view
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+
+THUMB_WIDTH = 96  # analysis resolution - plenty for cuts and brightness
+HIST_BINS = 16    # per channel
+HASH_SIZE = 8     # 8x8 = 64-bit difference hash
+MOTION_LEVEL = 12 # gray levels a pixel must change by to count as moving
+
+
+# ============ DECODING ============
+
+def video_info(path):
+    """Duration, fps, size and (estimated) frame count of a video"""
+    infos = ffmpeg_parse_infos(path)
+    return {"duration": infos["duration"], "fps": infos["video_fps"], "size": infos["video_size"],
+            "frames": infos.get("video_n_frames", 0), "start": infos.get("start", 0.0)}
+
+
+def thumb_size(size, width=THUMB_WIDTH):
+    """Thumbnail (w, h) for a frame size, keeping the aspect ratio"""
+    w, h = size
+    return width, max(2, int(round(h * width / w / 2)) * 2)
+
+
+def read_thumbnails(path, info, width=THUMB_WIDTH, start_frame=0, frames=None):
+    """Yield frames of a video in order as small RGB uint8 arrays
+
+    start_frame/frames: only that range - the whole video by default
+    """
+    w, h = thumb_size(info["size"], width)
+    frame_bytes = w * h * 3
+    scale = f"scale={w}:{h}:flags=area"
+    cmd = [FFMPEG_BINARY, "-loglevel", "error"]
+    if start_frame:
+        # Seek a second early, then keep frames by their original timestamps -
+        # half a frame of margin makes the first one exactly start_frame
+        t = (start_frame - 0.5) / info["fps"]
+        cmd += ["-ss", "%.6f" % max(0.0, t - 1.0), "-copyts"]
+        scale = f"select='gte(t,{info['start'] + t:.6f})',{scale}"
+    cmd += ["-i", path, "-map", "0:v:0"]
+    if frames is not None:
+        cmd += ["-frames:v", str(frames)]
+    cmd += ["-vf", scale, "-fps_mode", "passthrough", "-pix_fmt", "rgb24", "-f", "rawvideo", "-"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=frame_bytes * 32)
+    try:
+        while True:
+            buf = proc.stdout.read(frame_bytes)
+            if len(buf) < frame_bytes:
+                break
+            yield np.frombuffer(buf, dtype=np.uint8).reshape(h, w, 3)
+    finally:
+        proc.stdout.close()
+        proc.terminate()
+        proc.wait()
+
+
+# ============ SIGNATURES ============
+
+def luma(thumb):
+    """Grayscale (BT.601) version of an RGB thumbnail"""
+    r, g, b = (thumb[:, :, c].astype(np.uint16) for c in range(3))
+    return ((r * 77 + g * 150 + b * 29) >> 8).astype(np.uint8)
+
+
+def color_histogram(thumb):
+    """Normalized per-channel histogram, HIST_BINS bins per channel"""
+    shift = 8 - int(np.log2(HIST_BINS))
+    bins = (thumb >> shift).reshape(-1, 3) + np.arange(3) * HIST_BINS
+    return np.bincount(bins.ravel(), minlength=3 * HIST_BINS) / (thumb.shape[0] * thumb.shape[1])
+
+
+def sharpness(frame):
+    """Mean absolute Laplacian of an int16 grayscale frame - high for crisp detail"""
+    lap = 4 * frame[1:-1, 1:-1] - frame[:-2, 1:-1] - frame[2:, 1:-1] - frame[1:-1, :-2] - frame[1:-1, 2:]
+    return np.abs(lap).mean()
+
+
+def skin_ratio(thumb):
+    """Fraction of skin-toned pixels (YCbCr box) in the center half of the frame"""
+    h, w = thumb.shape[:2]
+    r, g, b = (thumb[h // 4:h - h // 4, w // 4:w - w // 4, c].astype(np.int16) for c in range(3))
+    cb = 128 + ((-43 * r - 85 * g + 128 * b) >> 8)
+    cr = 128 + ((128 * r - 107 * g - 21 * b) >> 8)
+    return np.count_nonzero((cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)) / cb.size
+
+
+def difference_hash(gray):
+    """64-bit perceptual hash (8 bytes): is each cell brighter than its right neighbour"""
+    small = np.asarray(Image.fromarray(gray).resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX), dtype=np.int16)
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+# ============ FEATURE STORE ============
+# FEATURE_STORE/<content key>_<thumb width>/ holds meta.json plus one .npy per
+# column; columns are opened memory-mapped, so a lookup costs milliseconds
+
+FEATURE_STORE = os.path.join(os.path.expanduser("~"), ".video_features")
+COLUMNS = ("brightness", "diff", "motion", "sharpness", "contrast", "skin", "hist", "hash")
+STORE_VERSION = 2
+
+
+def content_key(path, samples=16, chunk=1 << 20):
+    """Hash of a video's bytes - size plus evenly spaced 1 MB samples (all of it when small)"""
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, 'rb') as f:
+        if size <= samples * chunk:
+            digest.update(f.read())
+        else:
+            for i in range(samples):
+                f.seek((size - chunk) * i // (samples - 1))
+                digest.update(f.read(chunk))
+    return digest.hexdigest()
+
+
+def feature_dir(path, width=THUMB_WIDTH, store=FEATURE_STORE):
+    """Store directory of a video's features"""
+    return os.path.join(store, f"{content_key(path)}_{width}")
+
+
+def save_features(features, directory):
+    """Write feature columns + meta.json to a store directory (replacing it atomically)"""
+    tmp = directory + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for column in COLUMNS:
+        np.save(os.path.join(tmp, column + ".npy"), features[column])
+    meta = {key: features[key] for key in ("duration", "fps", "size")}
+    meta["version"] = STORE_VERSION
+    with open(os.path.join(tmp, "meta.json"), 'w') as f:
+        json.dump(meta, f)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.rename(tmp, directory)
+
+
+def load_features(directory):
+    """Memory-mapped features from a store directory (None if missing or outdated)"""
+    try:
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.pop("version", None) != STORE_VERSION:
+        return None
+    for column in COLUMNS:
+        meta[column] = np.load(os.path.join(directory, column + ".npy"), mmap_mode='r')
+    return meta
+
+
+# ============ FEATURES ============
+
+def scan_frames(path, info, width=THUMB_WIDTH, start_frame=0, frames=None):
+    """Feature arrays for frames [start_frame, start_frame + frames) of a video"""
+    # Decode one frame before the range so its first diff has something to compare to
+    overlap = 1 if start_frame else 0
+    count = frames + overlap if frames is not None else None
+    rows = {column: [] for column in COLUMNS}
+    prev = None
+
+    for thumb in read_thumbnails(path, info, width, start_frame - overlap, count):
+        gray = luma(thumb)
+        frame = gray.astype(np.int16)
+        rows["brightness"].append(gray.mean())
+        # Change to the previous frame (0 for the first)
+        if prev is not None:
+            change = np.abs(frame - prev)
+            rows["diff"].append(change.mean())
+            rows["motion"].append(np.count_nonzero(change > MOTION_LEVEL) / change.size)
+        else:
+            rows["diff"].append(0.0)
+            rows["motion"].append(0.0)
+        rows["sharpness"].append(sharpness(frame))
+        rows["contrast"].append(gray.std())
+        rows["skin"].append(skin_ratio(thumb))
+        rows["hist"].append(color_histogram(thumb))
+        rows["hash"].append(difference_hash(gray))
+        prev = frame
+
+    skip = slice(overlap, None)
+    features = {column: np.array(rows[column][skip], dtype=np.float32) for column in COLUMNS}
+    features["hist"] = features["hist"].reshape(-1, 3 * HIST_BINS)
+    features["hash"] = np.array(rows["hash"][skip], dtype=np.uint8).reshape(-1, HASH_SIZE * HASH_SIZE // 8)
+    return features
+
+
+# ============ PARALLEL SCANNING ============
+# Long videos are cut into chunks that worker processes decode independently.
+# Each chunk decodes one frame of overlap, so the joined columns are exactly
+# what one sequential pass gives, and events are only detected after joining -
+# a cut or flash on a chunk boundary is found once, like anywhere else.
+
+ANALYSIS_CHUNK = 30.0  # seconds of video per job
+
+
+def chunk_ranges(info):
+    """(start_frame, frames) jobs covering a video - the last one reads to the end"""
+    chunk = max(1, int(ANALYSIS_CHUNK * info["fps"]))
+    starts = list(range(0, max(1, info["frames"]), chunk))
+    return [(start, chunk) for start in starts[:-1]] + [(starts[-1], None)]
+
+
+def scan_videos(paths, width=THUMB_WIDTH, store=FEATURE_STORE, workers=None):
+    """Per-frame features of several videos - stored ones are loaded, the rest scanned in parallel"""
+    workers = workers or os.cpu_count() or 1
+    results, todo = {}, {}
+
+    for path in paths:
+        directory = feature_dir(path, width, store) if store else None
+        features = load_features(directory) if directory else None
+        if features is not None:
+            results[path] = features
+        else:
+            todo[path] = (video_info(path), directory)
+
+    jobs = [(path, start, frames) for path, (info, _) in todo.items() for start, frames in chunk_ranges(info)]
+    if jobs:
+        print(f"Scanning {len(todo)} video(s) in {len(jobs)} chunks on {min(workers, len(jobs))} workers...")
+    if len(jobs) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(scan_frames, path, todo[path][0], width, start, frames)
+                       for path, start, frames in jobs]
+            chunks = [future.result() for future in futures]
+    else:
+        chunks = [scan_frames(path, todo[path][0], width, start, frames) for path, start, frames in jobs]
+
+    for path, (info, directory) in todo.items():
+        parts = [chunk for job, chunk in zip(jobs, chunks) if job[0] == path]
+        features = {key: info[key] for key in ("duration", "fps", "size")}
+        for column in COLUMNS:
+            features[column] = np.concatenate([part[column] for part in parts])
+        if directory:
+            try:
+                os.makedirs(store, exist_ok=True)
+                save_features(features, directory)
+            except OSError:
+                print(f"Warning: could not save features to {directory}")
+        results[path] = features
+
+    return [results[path] for path in paths]
+
+
+def scan_video(path, width=THUMB_WIDTH, store=FEATURE_STORE, workers=None):
+    """Per-frame features of a video, from the store or from a (chunked, parallel) decode"""
+    return scan_videos([path], width, store, workers)[0]
+
+
+def feature_at(features, column, t):
+    """Value of a feature column at time t (seconds)"""
+    values = features[column]
+    return values[min(len(values) - 1, max(0, int(t * features["fps"] + 0.00001)))]
+
+
+def signature_distances(features):
+    """Per-frame histogram distance (0-1) and hash distance (0-64 bits) to the previous frame"""
+    hist, hashes = features["hist"], features["hash"]
+    # Total variation distance, averaged over the three channels
+    hist_dist = np.zeros(len(hist), dtype=np.float32)
+    hist_dist[1:] = np.abs(np.diff(hist, axis=0)).sum(axis=1) / 6
+    hash_dist = np.zeros(len(hashes), dtype=np.float32)
+    hash_dist[1:] = np.unpackbits(hashes[1:] ^ hashes[:-1], axis=1).sum(axis=1)
+    return hist_dist, hash_dist
+
+
+# ============ EVENTS ============
+
+def adaptive_threshold(signal, sensitivity, floor, window):
+    """Per-frame threshold: sensitivity x the local median of the signal, never below floor"""
+    window = max(3, window | 1)
+    padded = np.pad(signal, window // 2, mode='edge')
+    local = np.median(sliding_window_view(padded, window), axis=1)
+    return np.maximum(floor, sensitivity * local)
+
+
+def cut_frames(features, sensitivity=4.0, hist_floor=0.2, hash_floor=20, window=1.0):
+    """Frame indices where the histogram or the hash jumps well above its local level
+
+    Fast motion keeps the histogram steady and raises the hash baseline, so it
+    doesn't fire; low-contrast cuts still move the histogram well above its baseline
+    """
+    hist_dist, hash_dist = signature_distances(features)
+    frames = int(window * features["fps"])
+    is_cut = ((hist_dist > adaptive_threshold(hist_dist, sensitivity, hist_floor, frames)) |
+              (hash_dist > adaptive_threshold(hash_dist, sensitivity, hash_floor, frames)))
+    is_cut[0] = False
+    return np.flatnonzero(is_cut)
+
+
+def detect_events(features, sensitivity=4.0, flash_threshold=200, min_gap=0.1):
+    """Cut and flash events from per-frame features
+
+    cuts:    [{"time", "diff", "brightness", "type"}] - type is "flash" when the new frame is a flash
+    flashes: [time] of very bright frames
+    """
+    fps = features["fps"]
+    brightness, diff = features["brightness"], features["diff"]
+
+    cuts = []
+    for i in cut_frames(features, sensitivity):
+        t = int(i) / fps
+        if not cuts or t - cuts[-1]["time"] > min_gap:
+            cuts.append({
+                "time": round(t, 2),
+                "diff": round(float(diff[i]), 1),
+                "brightness": round(float(brightness[i]), 1),
+                "type": "flash" if brightness[i] > flash_threshold else "cut",
+            })
+
+    flashes = []
+    for i in np.flatnonzero(brightness > flash_threshold):
+        t = int(i) / fps
+        if not flashes or t - flashes[-1] > min_gap:
+            flashes.append(round(t, 2))
+
+    return cuts, flashes
+
+
+def sensitivity_sweep(features, sensitivities=(2, 3, 4, 6, 8)):
+    """Number of cut frames found at each sensitivity - cheap, runs on the cached features"""
+    return {s: len(cut_frames(features, s)) for s in sensitivities}
@@ -0,0 +1,127 @@
+"""
+Batch watermark renderer
+Renders every watermark variant in a manifest across worker processes
+
+    python watermark_batch.py watermarks.json [workers]
+
+The manifest is a JSON list of variants, or a dict of lists that expands to
+every combination:
+
+    {"style": ["finez"], "text": ["finez_editz", "z_editz"],
+     "size": [[600, 600], [648, 584], [720, 1280]], "fps": [30, 60]}
+
+Variant fields: style (finez / z_editz), text, size, fps, font_size, font (a
+font file, or [path, index], tried before the style's own fonts), format (mp4,
+or mov / npz to keep the alpha - see watermark_output) and output (default
+OUTPUT_DIR/<text>_<w>x<h>_<fps>fps_<font_size>px[_<font>].<format>, with a
+<style>_ prefix unless the text already starts with the style name). Two
+variants may not share an output file. Each worker loads a font once per
+(font, size) and builds a layout once per variant.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import collections
+import itertools
+import json
+import os
+import sys
+import time
+
+import create_watermark
+import finez_watermark
+from watermark_output import render_watermark
+
+STYLES = {
+    "finez": finez_watermark,
+    "z_editz": create_watermark,
+}
+OUTPUT_DIR = "output/watermarks"
+
+
+# ============ MANIFEST ============
+
+def expand_manifest(manifest):
+    """List of variant dicts from a list, or from a dict of lists (every combination)"""
+    if isinstance(manifest, list):
+        return manifest
+    fields = list(manifest)
+    return [dict(zip(fields, values)) for values in itertools.product(*manifest.values())]
+
+
+def resolve_variant(variant):
+    """Fill in a variant's defaults from its style module"""
+    style = STYLES[variant.get("style", "finez")]
+    resolved = {
+        "style": variant.get("style", "finez"),
+        "text": variant.get("text", style.TEXT),
+        "size": tuple(variant.get("size", (style.WIDTH, style.HEIGHT))),
+        "fps": variant.get("fps", style.FPS),
+        "font_size": variant.get("font_size", style.FONT_SIZE),
+        "font": variant.get("font"),
+    }
+    width, height = resolved["size"]
+    # Named after the text; the style is prefixed only when the text doesn't already start
+    # with it, so two styles of one text still get different files
+    name = resolved["text"]
+    if not name.startswith(resolved["style"]):
+        name = f"{resolved['style']}_{name}"
+    name = f"{name}_{width}x{height}_{resolved['fps']}fps_{resolved['font_size']}px"
+    if resolved["font"]:
+        font_path = resolved["font"][0] if isinstance(resolved["font"], list) else resolved["font"]
+        name += "_" + os.path.splitext(os.path.basename(font_path))[0].replace(" ", "_")
+    default = f"{name}.{variant.get('format', 'mp4')}"
+    resolved["output"] = variant.get("output", os.path.join(OUTPUT_DIR, default))
+    return resolved
+
+
+def load_manifest(path):
+    """Resolved variants of a manifest file"""
+    with open(path) as f:
+        return [resolve_variant(variant) for variant in expand_manifest(json.load(f))]
+
+
+# ============ RENDERING ============
+
+def render_variant(variant, threads=None):
+    """Worker: render one resolved variant to its output file"""
+    style = STYLES[variant["style"]]
+    font = style.load_font(variant["font_size"], variant["font"])  # cached per worker process (text_cache)
+    layout = style.make_layout(variant["text"], variant["size"], font)
+
+    os.makedirs(os.path.dirname(variant["output"]) or ".", exist_ok=True)
+    return render_watermark(style.render_frame, style.DURATION, layout, variant["output"],
+                            variant["fps"], threads)
+
+
+def render_batch(variants, workers=None):
+    """Render every variant, spread over worker processes"""
+    if not variants:
+        print("No watermark variants to render")
+        return
+    # Workers writing the same file at once would silently lose a variant
+    outputs = collections.Counter(os.path.abspath(v["output"]) for v in variants)
+    clashes = [path for path, count in outputs.items() if count > 1]
+    if clashes:
+        raise ValueError(f"Several watermark variants write to the same file: {', '.join(clashes)}")
+    workers = min(workers or os.cpu_count() or 1, len(variants))
+    # Split the cores between the workers' x264 encoders
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    # Variants sharing a font back to back, so workers mostly reuse fonts they already loaded
+    variants = sorted(variants, key=lambda v: (v["style"], str(v["font"]), v["font_size"]))
+
+    print(f"Rendering {len(variants)} watermark variants on {workers} workers...")
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_variant, variant, threads) for variant in variants]
+        for done, future in enumerate(as_completed(futures), 1):
+            print(f"  [{done}/{len(variants)}] {future.result()}")
+    print(f"Done in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python watermark_batch.py <manifest.json> [workers]")
+        sys.exit(1)
+
+    variants = load_manifest(sys.argv[1])
+    render_batch(variants, int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,118 @@
+"""
+Output formats for the animated watermarks
+The watermarks are white shapes on black, so a rendered frame's brightness is
+exactly the watermark's alpha. The output format follows the file extension:
+
+- .mp4: opaque H.264 on black (as before)
+- .mov: ProRes 4444 with alpha - drops straight onto a timeline in any editor
+- .npz: packed RGBA stack trimmed to the box the animation ever covers, plus
+        that box's position - watermark_overlay() turns a frame of it into an
+        overlay for render_edit, compile_watermark() all of them for
+        edit_engine.composite_overlay
+"""
+
+import numpy as np
+
+from edit_engine import compile_overlay, placement
+from frame_writer import FrameWriter
+
+
+# ============ RENDERING ============
+
+def frame_states(layout, fps, frames):
+    """Animation state {property: value} of each frame number in frames (any order or subset)
+
+    All properties of all the frames come from one evaluation of layout["timeline"].
+    """
+    frames = np.asarray(frames)
+    curves = layout["timeline"].evaluate(frames / fps)
+    return [{name: values[i] for name, values in curves.items()} for i in range(len(frames))]
+
+
+def render_watermark(render_frame, duration, layout, output, fps, threads=None):
+    """Render a watermark animation (render_frame(state, out, layout)) to output, in the format its extension picks"""
+    if output.endswith(".npz"):
+        return write_stack(render_frame, duration, layout, output, fps)
+
+    alpha = output.endswith(".mov")
+    gray = np.empty((layout["size"][1], layout["size"][0], 3), dtype=np.uint8)
+    with FrameWriter(output, layout["size"], fps, threads=threads, alpha=alpha) as writer:
+        for state in frame_states(layout, fps, range(int(round(duration * fps)))):
+            out = writer.next_buffer()
+            if alpha:
+                render_frame(state, gray, layout)
+                out[:, :, :3] = 255
+                out[:, :, 3] = gray[:, :, 0]
+            else:
+                render_frame(state, out, layout)
+            writer.submit(out)
+    return output
+
+
+def write_stack(render_frame, duration, layout, output, fps):
+    """Save the animation as an RGBA stack of the box it covers (.npz)"""
+    width, height = layout["size"]
+    count = int(round(duration * fps))
+    states = frame_states(layout, fps, range(count))
+    gray = np.empty((height, width, 3), dtype=np.uint8)
+
+    # First pass: which rows and columns are ever drawn
+    rows_used = np.zeros(height, dtype=bool)
+    cols_used = np.zeros(width, dtype=bool)
+    for state in states:
+        render_frame(state, gray, layout)
+        drawn = gray[:, :, 0] > 0
+        rows_used |= drawn.any(axis=1)
+        cols_used |= drawn.any(axis=0)
+    rows, cols = np.flatnonzero(rows_used), np.flatnonzero(cols_used)
+    if not len(rows):
+        rows, cols = np.array([0]), np.array([0])
+    y, x = int(rows[0]), int(cols[0])
+    box_h, box_w = int(rows[-1]) + 1 - y, int(cols[-1]) + 1 - x
+
+    # Second pass: keep only that box
+    frames = np.empty((count, box_h, box_w, 4), dtype=np.uint8)
+    frames[:, :, :, :3] = 255
+    for n, state in enumerate(states):
+        render_frame(state, gray, layout)
+        frames[n, :, :, 3] = gray[y:y + box_h, x:x + box_w, 0]
+
+    np.savez_compressed(output, frames=frames, position=(x, y), size=(width, height), fps=fps)
+    return output
+
+
+# ============ OVERLAYING ============
+
+def load_watermark(path):
+    """{"frames" (n, h, w, 4), "position" (x, y) in its canvas, "size", "fps"} of a .npz watermark"""
+    with np.load(path) as data:
+        return {
+            "frames": data["frames"],
+            "position": tuple(int(v) for v in data["position"]),
+            "size": tuple(int(v) for v in data["size"]),
+            "fps": float(data["fps"]),
+        }
+
+
+def watermark_overlay(watermark, size, n=0, origin=(0, 0)):
+    """Full-frame (height, width, 4) RGBA overlay of watermark frame n (looping) - for render_edit(overlay=...)
+
+    origin: where the watermark's canvas sits in the frame (its box keeps its offset in that canvas)
+    """
+    width, height = size
+    overlay = np.zeros((height, width, 4), dtype=np.uint8)
+    box = watermark["frames"][n % len(watermark["frames"])]
+    x = origin[0] + watermark["position"][0]
+    y = origin[1] + watermark["position"][1]
+    target, source = placement(overlay.shape, box.shape, x, y)
+    overlay[target] = box[source]
+    return overlay
+
+
+def compile_watermark(watermark, size, origin=(0, 0)):
+    """compile_overlay() of every watermark frame, for blending frame n with composite_overlay(frame, compiled[n])
+
+    Frames with nothing visible compile to None (skip them).
+    """
+    return [compile_overlay(watermark_overlay(watermark, size, n, origin))
+            for n in range(len(watermark["frames"]))]